@@ -0,0 +1,54 @@
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from core.models import db_helper, LeaderboardEntry, Subject, SubjectsVersion
+
+default_batch_size = 1000
+
+
+async def recompute_subject_counters(
+    user_id: int | None = None,
+    batch_size: int = default_batch_size,
+) -> int:
+    """
+    Сверяет счётчики прогресса в subjects с активностями и исправляет разошедшиеся.
+    Предметы обходятся пачками по id, каждая пачка - отдельная короткая транзакция.
+    Версия владельцев исправленных предметов увеличивается до пересчёта: это та же
+    блокировка, что у обычной записи, и новый ETag, чтобы клиенты не держали старые
+    /list?view=summary и /stats. После этого рейтинг групп пересчитывается из счётчиков.
+    Возвращает число исправленных предметов.
+    """
+    repaired = 0
+    last_id = 0
+    async with db_helper.session_factory() as session:
+        while True:
+            stmt = select(Subject.id).where(Subject.id > last_id).order_by(Subject.id).limit(batch_size)
+            if user_id is not None:
+                stmt = stmt.where(Subject.user_id == user_id)
+            subject_ids = list((await session.scalars(stmt)).all())
+            if not subject_ids:
+                break
+            drifted = await Subject.find_drifted(session, subject_ids)
+            if drifted:
+                # в порядке user_id, чтобы параллельные запуски не взаимоблокировались
+                for owner_id in sorted({owner_id for _, owner_id in drifted}):
+                    await SubjectsVersion.bump(session, owner_id)
+                repaired += await Subject.refresh_counters(
+                    session, [s_id for s_id, _ in drifted], only_drifted=True
+                )
+            await session.commit()
+            last_id = subject_ids[-1]
+        await LeaderboardEntry.recompute(session, user_id)
+        await session.commit()
+    return repaired
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пересчёт счётчиков прогресса предметов")
+    parser.add_argument("--user-id", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=default_batch_size)
+    args = parser.parse_args()
+    repaired = asyncio.run(recompute_subject_counters(args.user_id, args.batch_size))
+    print(f"Исправлено предметов: {repaired}")
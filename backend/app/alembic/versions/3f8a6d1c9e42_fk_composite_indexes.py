@@ -0,0 +1,45 @@
+"""fk composite indexes
+
+Revision ID: 3f8a6d1c9e42
+Revises: 0d6b8c2f4a19
+Create Date: 2026-10-18 16:05:12.448930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a6d1c9e42'
+down_revision: Union[str, Sequence[str], None] = '0d6b8c2f4a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY не блокирует запись, но не может идти внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_subjects_user_id_id'), 'subjects', ['user_id', 'id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            op.f('ix_activities_subject_id_id'), 'activities', ['subject_id', 'id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_activities_subject_id_id'), table_name='activities',
+            postgresql_concurrently=True, if_exists=True,
+        )
+        op.drop_index(
+            op.f('ix_subjects_user_id_id'), table_name='subjects',
+            postgresql_concurrently=True, if_exists=True,
+        )
@@ -5,6 +5,8 @@ from core.config import settings
 from .auth import router as auth_router
 from .users import router as users_router
 from .subjects import router as subjects_router
+from .sync import router as sync_router
+from .leaderboard import router as leaderboard_router
 
 http_bearer = HTTPBearer(auto_error=False)
 
@@ -14,4 +16,6 @@ router = APIRouter(
 )
 router.include_router(auth_router)
 router.include_router(users_router)
-router.include_router(subjects_router)
\ No newline at end of file
+router.include_router(subjects_router)
+router.include_router(sync_router)
+router.include_router(leaderboard_router)
\ No newline at end of file
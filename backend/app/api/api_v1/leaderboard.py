@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.authentication.fastapi_users import current_active_user
+from core.config import settings
+from core.models import User, db_helper, LeaderboardEntry
+from core.schemas.leaderboard import LeaderboardEntryRead, LeaderboardRead
+
+router = APIRouter(
+    prefix=settings.api.v1.leaderboard,
+    tags=["Leaderboard"]
+)
+
+
+@router.get("", response_model=LeaderboardRead)
+async def get_group_leaderboard(
+        limit: int = Query(10, ge=1, le=100, description="сколько первых мест вернуть"),
+        user: User = Depends(current_active_user),
+        session: AsyncSession = Depends(db_helper.session_getter)
+):
+    """
+    Рейтинг группы пользователя по суммарному прогрессу. Строки рейтинга поддерживаются
+    при записи, поэтому top - это LIMIT по индексу (group_id, score), а место пользователя -
+    подсчёт строк с большим счётом по тому же индексу, без агрегации активностей группы.
+    Группа берётся из строки рейтинга, которую синхронизация переносит при смене группы:
+    снимок пользователя в токене может оставаться без группы до истечения токена.
+    """
+    mine = await session.get(LeaderboardEntry, user.id)
+    if mine is None:
+        raise HTTPException(status_code=404, detail="Группа ещё не определена")
+    group_id = mine.group_id
+
+    rows = (await session.execute(
+        select(LeaderboardEntry.user_id, LeaderboardEntry.score, LeaderboardEntry.progress_max)
+        .where(LeaderboardEntry.group_id == group_id)
+        .order_by(LeaderboardEntry.score.desc(), LeaderboardEntry.user_id)
+        .limit(limit)
+    )).all()
+
+    top: list[LeaderboardEntryRead] = []
+    for position, (user_id, score, progress_max) in enumerate(rows, start=1):
+        # top начинается с первого места, поэтому место - это позиция первого с таким счётом
+        rank = top[-1].rank if top and top[-1].score == score else position
+        top.append(LeaderboardEntryRead(rank=rank, user_id=user_id, score=score, max_progress=progress_max))
+
+    me = next((entry for entry in top if entry.user_id == user.id), None)
+    if me is None:
+        me = LeaderboardEntryRead(
+            rank=await LeaderboardEntry.rank(session, group_id, mine.score),
+            user_id=user.id,
+            score=mine.score,
+            max_progress=mine.progress_max,
+        )
+
+    return LeaderboardRead(group_id=group_id, top=top, me=me)
@@ -1,15 +1,41 @@
-from typing import List
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import List, Literal, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic_core import to_json
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import case, delete, func, select, update
 
 from core.authentication.fastapi_users import current_active_user
 from core.config import settings
-from core.models import User, db_helper, Subject, Activity
+from core.models import (
+    User,
+    db_helper,
+    Subject,
+    Activity,
+    LeaderboardEntry,
+    ProgressDay,
+    ProgressEvent,
+    SubjectsVersion,
+    Tombstone,
+)
 from core.schemas.activity import ActivityRead, ActivityCreate
-from core.schemas.subject import SubjectRead, SubjectCreate
+from core.schemas.batch import (
+    BatchRequest,
+    BatchResult,
+    CreateSubjectOp,
+    AddActivityOp,
+    ProgressOp,
+    DeleteSubjectOp,
+    DeleteActivityOp,
+)
+from core.schemas.changes import ChangesRead, SubjectChange
+from core.schemas.history import ProgressDayRead, ProgressHistoryRead
+from core.schemas.stats import ProgressStatsRead, ProgressTotals, SubjectProgressStats
+from core.schemas.subject import SubjectRead, SubjectCreate, SubjectNameRead, SubjectSummaryRead
+from core.utils import subject_payloads, subject_summary_payloads
+from services.progress_rollup import local_day
 
 router = APIRouter(
     prefix=settings.api.v1.subjects,
@@ -17,19 +43,235 @@ router = APIRouter(
 )
 
 
+async def _change_activity_progress(
+        session: AsyncSession,
+        activity_id: int,
+        user_id: int,
+        delta: int,
+        change_seq: int,
+) -> tuple[Activity, int] | None:
+    """
+    Сдвигает current_progress на delta. Проверка владельца выполняется в самой БД.
+    Обычный клик не упирается в границы [0, max_progress] и обходится одним
+    UPDATE ... RETURNING со сдвигом ровно на delta. Если сдвиг упирается в границу,
+    текущее значение читается и записывается обрезанное; записи пользователя
+    сериализованы блокировкой SubjectsVersion.bump, поэтому прочитанное значение
+    не устареет. Коммит остаётся за вызывающим.
+    Возвращает активность и фактический сдвиг после обрезки по границам.
+    """
+    current = func.coalesce(Activity.current_progress, 0)
+    upper = func.coalesce(Activity.max_progress, 0)
+    owned = Activity.subject_id.in_(select(Subject.id).where(Subject.user_id == user_id))
+
+    def set_progress(value, *conditions):
+        return (
+            update(Activity)
+            .where(Activity.id == activity_id, *conditions)
+            .values(current_progress=value, change_seq=change_seq)
+            .returning(Activity)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+
+    shifted = current + delta
+    activity = await session.scalar(set_progress(shifted, owned, shifted >= 0, shifted <= upper))
+    if activity is not None:
+        return activity, delta
+
+    row = (await session.execute(select(current, upper).where(Activity.id == activity_id, owned))).one_or_none()
+    if row is None:
+        return None
+    previous, maximum = row
+    target = min(max(previous + delta, 0), maximum)
+    activity = await session.scalar(set_progress(target))
+    return activity, target - previous
+
+
+def _progress_counter_delta(activity: Activity, applied: int) -> Counter:
+    """Приращения счётчиков предмета после сдвига прогресса активности на applied."""
+    current = activity.current_progress or 0
+    return Subject.counter_delta((current - applied, activity.max_progress), (current, activity.max_progress))
+
+
+async def _delete_activity_row(session: AsyncSession, activity_id: int, user_id: int) -> tuple[int, int, int] | None:
+    """
+    Удаляет активность пользователя одним DELETE ... RETURNING и возвращает
+    (subject_id, current_progress, max_progress) удалённой строки - ровно то,
+    что было в ней в момент удаления, для журнала прогресса.
+    """
+    row = (await session.execute(
+        delete(Activity)
+        .where(
+            Activity.id == activity_id,
+            Activity.subject_id.in_(select(Subject.id).where(Subject.user_id == user_id)),
+        )
+        .returning(
+            Activity.subject_id,
+            func.coalesce(Activity.current_progress, 0),
+            func.coalesce(Activity.max_progress, 0),
+        )
+    )).one_or_none()
+    return tuple(row) if row is not None else None
+
+
+async def _delete_subject_rows(session: AsyncSession, subject_id: int) -> tuple[int, int]:
+    """Удаляет предмет с активностями; возвращает суммы current_progress и max_progress удалённых активностей."""
+    removed = (await session.execute(
+        delete(Activity)
+        .where(Activity.subject_id == subject_id)
+        .returning(func.coalesce(Activity.current_progress, 0), func.coalesce(Activity.max_progress, 0))
+    )).all()
+    await session.execute(delete(Subject).where(Subject.id == subject_id))
+    return sum(row[0] for row in removed), sum(row[1] for row in removed)
+
+
+def _progress_event(
+        kind: str,
+        subject_id: int,
+        activity_id: int | None,
+        progress_delta: int,
+        max_delta: int = 0,
+) -> dict:
+    return {
+        "kind": kind,
+        "subject_id": subject_id,
+        "activity_id": activity_id,
+        "progress_delta": progress_delta,
+        "max_delta": max_delta,
+    }
+
+
+def _progress_kind(delta: int) -> str:
+    return ProgressEvent.PLUS if delta >= 0 else ProgressEvent.MINUS
+
+
+async def _record_progress(session: AsyncSession, user: User, events: list[dict]) -> None:
+    """
+    Записывает события прогресса и сдвигает строку пользователя в рейтинге группы
+    на их сумму, не пересчитывая её по предметам.
+    """
+    if not events:
+        return
+    await ProgressEvent.record(session, user.id, events)
+    await LeaderboardEntry.add_progress(
+        session,
+        user.id,
+        sum(event["progress_delta"] for event in events),
+        sum(event["max_delta"] for event in events),
+    )
+
+
+def _etag(user_id: int, version: int) -> str:
+    return f'W/"{user_id}-{version}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # сравнение слабое: префикс W/ не учитывается
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+async def _conditional_headers(
+        request: Request,
+        session: AsyncSession,
+        user_id: int,
+) -> tuple[dict[str, str], bool]:
+    """
+    Заголовки ETag для ответа и признак "у клиента актуальная версия" (ответ 304).
+    Версия читается до загрузки строк: запись между чтениями даст клиенту
+    более новые данные со старым ETag, и он просто запросит их ещё раз.
+    """
+    etag = _etag(user_id, await SubjectsVersion.current(session, user_id))
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    return headers, _etag_matches(request.headers.get("if-none-match"), etag)
+
+
+SUBJECT_VIEWS = {
+    "full": SubjectRead,
+    "summary": SubjectSummaryRead,
+    "none": SubjectNameRead,
+}
+SUBJECT_FIELDS = {view: set(schema.model_fields) for view, schema in SUBJECT_VIEWS.items()}
+
+
+async def _subject_rows(
+        session: AsyncSession,
+        user_id: int,
+        subject_id: int | None = None,
+        after: int | None = None,
+        limit: int | None = None,
+        counters: bool = False,
+) -> list:
+    """
+    (id, name) предметов пользователя по возрастанию id; after/limit - страница по ключу (user_id, id).
+    counters добавляет к строке activities_count и activities_completed.
+    """
+    columns = [Subject.id, Subject.display_name]
+    if counters:
+        columns += [Subject.activities_count, Subject.activities_completed]
+    stmt = (
+        select(*columns)
+        .where(Subject.user_id == user_id)
+        .order_by(Subject.id)
+    )
+    if subject_id is not None:
+        stmt = stmt.where(Subject.id == subject_id)
+    if after is not None:
+        stmt = stmt.where(Subject.id > after)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return list((await session.execute(stmt)).all())
+
+
+async def _subject_payloads(session: AsyncSession, subject_rows: list, view: str = "full") -> list[dict]:
+    """
+    Предметы для сериализации в JSON напрямую: запросы только по нужным колонкам,
+    без ORM-объектов и pydantic-моделей. view: full - с активностями,
+    summary - со счётчиками активностей (строки из _subject_rows с counters=True),
+    none - без активностей.
+    """
+    if view == "none":
+        return [{"name": name, "id": s_id} for s_id, name in subject_rows]
+    if view == "summary":
+        # счётчики хранятся в самих предметах и уже прочитаны вместе с ними
+        return subject_summary_payloads(subject_rows)
+
+    subject_ids = [row.id for row in subject_rows]
+    activity_rows = []
+    if subject_ids:
+        activity_rows = (await session.execute(
+            select(
+                Activity.id,
+                Activity.subject_id,
+                Activity.name,
+                func.coalesce(Activity.current_progress, 0),
+                Activity.max_progress,
+            )
+            .where(Activity.subject_id.in_(subject_ids))
+            .order_by(Activity.id)
+        )).all()
+
+    return subject_payloads(subject_rows, activity_rows)
+
+
 @router.post("/add", response_model=SubjectRead, status_code=status.HTTP_201_CREATED)
 async def add_custom_subject(
     subject_data: SubjectCreate,
     user: User = Depends(current_active_user),
     session: AsyncSession = Depends(db_helper.session_getter)
 ):
-    new_subject = Subject(
-        name=subject_data.name,
-        user_id=user.id
-    )
-    session.add(new_subject)
+    version = await SubjectsVersion.bump(session, user.id)
+    created = await Subject.bulk_create(session, user.id, [subject_data.name], version)
+    if not created:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Предмет с таким названием уже есть"
+        )
+    new_subject = created[0]
     await session.commit()
-    await session.refresh(new_subject)
 
     # Формируем словарь для Pydantic
     subject_dict = {
@@ -41,81 +283,406 @@ async def add_custom_subject(
     return SubjectRead.model_validate(subject_dict)
 
 
+@router.post("/batch", response_model=List[BatchResult])
+async def run_batch(
+    batch: BatchRequest,
+    user: User = Depends(current_active_user),
+    session: AsyncSession = Depends(db_helper.session_getter)
+):
+    """
+    Выполняет пакет операций над предметами и активностями в одной транзакции.
+    Права на все упомянутые предметы и активности проверяются двумя запросами
+    до начала записи; операции над чужими или удалёнными объектами получают 404
+    в своём результате, остальные применяются.
+    """
+    ops = batch.operations
+    version = await SubjectsVersion.bump(session, user.id)
+
+    subject_ids = {
+        op.subject_id for op in ops
+        if isinstance(op, (AddActivityOp, DeleteSubjectOp)) and op.subject_id is not None
+    }
+    activity_ids = {
+        op.activity_id for op in ops
+        if isinstance(op, (ProgressOp, DeleteActivityOp)) and op.activity_id is not None
+    }
+
+    owned_subjects: set[int] = set()
+    if subject_ids:
+        res = await session.execute(
+            select(Subject.id).where(Subject.id.in_(subject_ids), Subject.user_id == user.id)
+        )
+        owned_subjects = set(res.scalars().all())
+
+    # activity_id -> subject_id, чтобы операции после удаления предмета не трогали его активности
+    owned_activities: dict[int, int] = {}
+    if activity_ids:
+        res = await session.execute(
+            select(Activity.id, Activity.subject_id)
+            .join(Subject)
+            .where(Activity.id.in_(activity_ids), Subject.user_id == user.id)
+        )
+        owned_activities = {a_id: s_id for a_id, s_id in res.all()}
+        owned_subjects.update(owned_activities.values())
+
+    # индекс операции в пакете -> id созданного ею объекта
+    created_subjects: dict[int, int] = {}
+    created_activities: dict[int, int] = {}
+    # subject_id -> приращения счётчиков предмета, применяются перед коммитом
+    counter_deltas: defaultdict[int, Counter] = defaultdict(Counter)
+    events: list[dict] = []
+    results: list[BatchResult] = []
+
+    for index, op in enumerate(ops):
+        if isinstance(op, CreateSubjectOp):
+            created = await Subject.bulk_create(session, user.id, [op.name], version)
+            if not created:
+                results.append(BatchResult(
+                    index=index, op=op.op, status_code=status.HTTP_409_CONFLICT,
+                    detail="Предмет с таким названием уже есть",
+                ))
+                continue
+            new_subject = created[0]
+            created_subjects[index] = new_subject.id
+            owned_subjects.add(new_subject.id)
+            results.append(BatchResult(
+                index=index, op=op.op, status_code=status.HTTP_201_CREATED,
+                subject=SubjectRead(id=new_subject.id, name=new_subject.name, activities=[]),
+            ))
+
+        elif isinstance(op, AddActivityOp):
+            s_id = op.subject_id if op.subject_id is not None else created_subjects.get(op.subject_ref)
+            if s_id is None or s_id not in owned_subjects:
+                results.append(BatchResult(
+                    index=index, op=op.op, status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Предмет не найден",
+                ))
+                continue
+            new_act = Activity(
+                name=op.name, max_progress=op.max_progress, current_progress=0,
+                subject_id=s_id, change_seq=version,
+            )
+            session.add(new_act)
+            await session.flush()
+            created_activities[index] = new_act.id
+            owned_activities[new_act.id] = s_id
+            counter_deltas[s_id].update(Subject.counter_delta(None, (0, new_act.max_progress)))
+            events.append(_progress_event(ProgressEvent.ADD, s_id, new_act.id, 0, new_act.max_progress or 0))
+            results.append(BatchResult(
+                index=index, op=op.op, status_code=status.HTTP_201_CREATED,
+                activity=ActivityRead.model_validate(new_act),
+            ))
+
+        elif isinstance(op, ProgressOp):
+            a_id = op.activity_id if op.activity_id is not None else created_activities.get(op.activity_ref)
+            changed = None
+            if a_id is not None and owned_activities.get(a_id) in owned_subjects:
+                changed = await _change_activity_progress(session, a_id, user.id, op.delta, version)
+            if not changed:
+                results.append(BatchResult(
+                    index=index, op=op.op, status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Активность не найдена",
+                ))
+                continue
+            activity, applied = changed
+            counter_deltas[activity.subject_id].update(_progress_counter_delta(activity, applied))
+            events.append(_progress_event(_progress_kind(op.delta), activity.subject_id, activity.id, applied))
+            results.append(BatchResult(
+                index=index, op=op.op, status_code=status.HTTP_200_OK,
+                activity=ActivityRead.model_validate(activity),
+            ))
+
+        elif isinstance(op, DeleteActivityOp):
+            if owned_activities.get(op.activity_id) not in owned_subjects:
+                results.append(BatchResult(
+                    index=index, op=op.op, status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Активность не найдена или доступ запрещен",
+                ))
+                continue
+            s_id, current, maximum = await _delete_activity_row(session, op.activity_id, user.id)
+            await Tombstone.record(session, user.id, Tombstone.ACTIVITY, [op.activity_id], version)
+            del owned_activities[op.activity_id]
+            counter_deltas[s_id].update(Subject.counter_delta((current, maximum), None))
+            events.append(_progress_event(ProgressEvent.DELETE, s_id, op.activity_id, -current, -maximum))
+            results.append(BatchResult(index=index, op=op.op, status_code=status.HTTP_204_NO_CONTENT))
+
+        elif isinstance(op, DeleteSubjectOp):
+            if op.subject_id not in owned_subjects:
+                results.append(BatchResult(
+                    index=index, op=op.op, status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Предмет не найден или доступ запрещен",
+                ))
+                continue
+            current, maximum = await _delete_subject_rows(session, op.subject_id)
+            events.append(_progress_event(ProgressEvent.DELETE_SUBJECT, op.subject_id, None, -current, -maximum))
+            await Tombstone.record(session, user.id, Tombstone.SUBJECT, [op.subject_id], version)
+            owned_subjects.discard(op.subject_id)
+            counter_deltas.pop(op.subject_id, None)
+            results.append(BatchResult(index=index, op=op.op, status_code=status.HTTP_204_NO_CONTENT))
+
+    await Subject.apply_counter_deltas(session, counter_deltas)
+    await _record_progress(session, user, events)
+    await session.commit()
+    return results
+
+
 @router.delete("/{subject_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_subject(
     subject_id: int,
     user: User = Depends(current_active_user),
     session: AsyncSession = Depends(db_helper.session_getter)
 ):
-    stmt = select(Subject).where(Subject.id == subject_id, Subject.user_id == user.id)
-    result = await session.execute(stmt)
-    subject = result.scalar_one_or_none()
-
-    if not subject:
+    # версия блокируется до чтения: параллельный plus/minus не изменит строки между
+    # проверкой и удалением, и в журнал попадут именно удалённые значения
+    version = await SubjectsVersion.bump(session, user.id)
+    owned = await session.scalar(
+        select(Subject.id).where(Subject.id == subject_id, Subject.user_id == user.id)
+    )
+    if owned is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Предмет не найден или доступ запрещен"
         )
 
-    await session.delete(subject)
+    current, maximum = await _delete_subject_rows(session, subject_id)
+    await Tombstone.record(session, user.id, Tombstone.SUBJECT, [subject_id], version)
+    await _record_progress(session, user, [_progress_event(
+        ProgressEvent.DELETE_SUBJECT, subject_id, None, -current, -maximum,
+    )])
     await session.commit()
     return None
 
 
-@router.get("/list", response_model=List[SubjectRead])
+@router.get(
+    "/list",
+    response_model=None,
+    responses={status.HTTP_200_OK: {"model": List[Union[SubjectRead, SubjectSummaryRead, SubjectNameRead]]}},
+)
 async def get_subjects_list(
+        request: Request,
+        after: int | None = Query(None, ge=0, description="id последнего предмета предыдущей страницы"),
+        limit: int | None = Query(None, ge=1, le=500, description="размер страницы; без него - все предметы"),
+        view: Literal["full", "summary", "none"] = Query(
+            "full", description="full - с активностями, summary - счётчики активностей, none - без активностей"
+        ),
+        fields: str | None = Query(None, description="поля предмета через запятую, например id,name"),
         user: User = Depends(current_active_user),
         session: AsyncSession = Depends(db_helper.session_getter)
 ):
-    stmt = (
-        select(Subject)
-        .options(selectinload(Subject.activities))
-        .where(Subject.user_id == user.id)
+    """
+    Предметы пользователя по возрастанию id. При limit страница выбирается по ключу
+    (user_id, id) от after, а id для следующей страницы приходит в заголовке X-Next-Cursor.
+    Схема элемента задаётся view (SUBJECT_VIEWS), fields оставляет только перечисленные поля.
+    """
+    selected = None
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = set(selected) - SUBJECT_FIELDS[view]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Неизвестные поля для view={view}: {', '.join(sorted(unknown))}",
+            )
+
+    headers, not_modified = await _conditional_headers(request, session, user.id)
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # на одну строку больше, чтобы узнать, есть ли следующая страница
+    subject_rows = await _subject_rows(
+        session,
+        user.id,
+        after=after,
+        limit=limit + 1 if limit is not None else None,
+        counters=view == "summary",
     )
-    result = await session.execute(stmt)
-    subjects = result.scalars().all()
+    if limit is not None and len(subject_rows) > limit:
+        subject_rows = subject_rows[:limit]
+        headers["X-Next-Cursor"] = str(subject_rows[-1].id)
+
+    payloads = await _subject_payloads(session, subject_rows, view)
+    if selected is not None:
+        payloads = [{key: p[key] for key in selected} for p in payloads]
+    return Response(content=to_json(payloads), media_type="application/json", headers=headers)
 
-    subjects_list = []
-    for s in subjects:
-        subject_dict = {
-            "id": s.id,
-            "name": s.name,
-            "user_id": s.user_id,
-            "activities": [
-                ActivityRead.model_validate(a) for a in getattr(s, "activities", [])
-            ]
-        }
-        subjects_list.append(SubjectRead.model_validate(subject_dict))
 
-    return subjects_list
+@router.get("/changes", response_model=ChangesRead)
+async def get_subject_changes(
+        since: int = Query(0, ge=0),
+        user: User = Depends(current_active_user),
+        session: AsyncSession = Depends(db_helper.session_getter)
+):
+    """
+    Изменения предметов и активностей после курсора since (значение cursor из прошлого ответа).
+    since=0 или курсор новее текущей версии - полный снимок с reset=true:
+    клиент заменяет свои данные целиком, а не применяет изменения.
+    """
+    # версия читается первой: запись, закоммиченная позже, попадёт и в этот ответ,
+    # и в следующий - применять изменения повторно безопасно
+    cursor = await SubjectsVersion.current(session, user.id)
+    reset = since == 0 or since > cursor
+
+    subjects_stmt = select(Subject).where(Subject.user_id == user.id)
+    activities_stmt = select(Activity).where(
+        Activity.subject_id.in_(select(Subject.id).where(Subject.user_id == user.id))
+    )
+    if not reset:
+        subjects_stmt = subjects_stmt.where(Subject.change_seq > since)
+        activities_stmt = activities_stmt.where(Activity.change_seq > since)
+
+    subjects = (await session.scalars(subjects_stmt)).all()
+    activities = (await session.scalars(activities_stmt)).all()
+
+    deleted_subjects: list[int] = []
+    deleted_activities: list[int] = []
+    if not reset:
+        res = await session.execute(
+            select(Tombstone.kind, Tombstone.object_id)
+            .where(Tombstone.user_id == user.id, Tombstone.change_seq > since)
+        )
+        for kind, object_id in res.all():
+            if kind == Tombstone.SUBJECT:
+                deleted_subjects.append(object_id)
+            else:
+                deleted_activities.append(object_id)
+
+    return ChangesRead(
+        cursor=cursor,
+        reset=reset,
+        subjects=[SubjectChange(id=s.id, name=s.display_name) for s in subjects],
+        activities=[ActivityRead.model_validate(a) for a in activities],
+        deleted_subjects=deleted_subjects,
+        deleted_activities=deleted_activities,
+    )
+
+
+def _progress_totals(count: int, current: int, maximum: int) -> dict:
+    return {
+        "activities_count": count,
+        "current_progress": current,
+        "max_progress": maximum,
+        "remaining": max(0, maximum - current),
+        "completion": current / maximum if maximum > 0 else 0.0,
+    }
+
+
+@router.get("/stats", response_model=ProgressStatsRead)
+async def get_progress_stats(
+        request: Request,
+        response: Response,
+        user: User = Depends(current_active_user),
+        session: AsyncSession = Depends(db_helper.session_getter)
+):
+    """
+    Прогресс по каждому предмету и в целом по счётчикам, которые хранятся
+    в строках предметов: один запрос по subjects без чтения активностей.
+    """
+    headers, not_modified = await _conditional_headers(request, session, user.id)
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+    stmt = (
+        select(
+            Subject.id,
+            Subject.display_name,
+            Subject.activities_count,
+            Subject.progress_current,
+            Subject.progress_max,
+        )
+        .where(Subject.user_id == user.id)
+        .order_by(Subject.id)
+    )
+    rows = (await session.execute(stmt)).all()
+
+    subjects = [
+        SubjectProgressStats(id=s_id, name=name, **_progress_totals(count, current, maximum))
+        for s_id, name, count, current, maximum in rows
+    ]
+    total = ProgressTotals(**_progress_totals(
+        sum(row[2] for row in rows),
+        sum(row[3] for row in rows),
+        sum(row[4] for row in rows),
+    ))
+    return ProgressStatsRead(subjects=subjects, total=total)
+
+
+@router.get("/history", response_model=ProgressHistoryRead)
+async def get_progress_history(
+        days: int = Query(30, ge=1, le=366, description="сколько последних дней вернуть"),
+        subject_id: int | None = Query(None, description="предмет; без него - по всем предметам"),
+        user: User = Depends(current_active_user),
+        session: AsyncSession = Depends(db_helper.session_getter)
+):
+    """
+    Прогресс по дням для графиков. Читаются только дневные суммы ProgressDay:
+    одна сумма до начала периода и строки за сам период. Последние изменения
+    появляются здесь после очередной свёртки журнала (progress_rollup.interval_seconds).
+    """
+    if subject_id is not None:
+        owned = await session.scalar(
+            select(Subject.id).where(Subject.id == subject_id, Subject.user_id == user.id)
+        )
+        if owned is None:
+            raise HTTPException(status_code=404, detail="Предмет не найден")
+
+    last_day = local_day(datetime.now(timezone.utc))
+    first_day = last_day - timedelta(days=days - 1)
+    filters = [ProgressDay.user_id == user.id]
+    if subject_id is not None:
+        filters.append(ProgressDay.subject_id == subject_id)
+
+    current, maximum = (await session.execute(
+        select(
+            func.coalesce(func.sum(ProgressDay.progress_delta), 0),
+            func.coalesce(func.sum(ProgressDay.max_delta), 0),
+        )
+        .where(*filters, ProgressDay.day < first_day)
+    )).one()
+    rows = (await session.execute(
+        select(
+            ProgressDay.day,
+            func.sum(ProgressDay.events),
+            func.sum(ProgressDay.progress_delta),
+            func.sum(ProgressDay.max_delta),
+        )
+        .where(*filters, ProgressDay.day >= first_day)
+        .group_by(ProgressDay.day)
+    )).all()
+    by_day = {day: (count, progress_delta, max_delta) for day, count, progress_delta, max_delta in rows}
+
+    result = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        count, progress_delta, max_delta = by_day.get(day, (0, 0, 0))
+        current += progress_delta
+        maximum += max_delta
+        result.append(ProgressDayRead(
+            day=day,
+            events=count,
+            progress_delta=progress_delta,
+            max_delta=max_delta,
+            current_progress=current,
+            max_progress=maximum,
+        ))
+    return ProgressHistoryRead(subject_id=subject_id, days=result)
 
 
 @router.get("/{subject_id}", response_model=SubjectRead)
 async def get_subject_details(
         subject_id: int,
+        request: Request,
         user: User = Depends(current_active_user),
         session: AsyncSession = Depends(db_helper.session_getter)
 ):
-    stmt = (
-        select(Subject)
-        .options(selectinload(Subject.activities))
-        .where(Subject.id == subject_id, Subject.user_id == user.id)
-    )
-    result = await session.execute(stmt)
-    subject = result.scalar_one_or_none()
+    headers, not_modified = await _conditional_headers(request, session, user.id)
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    if not subject:
+    payloads = await _subject_payloads(session, await _subject_rows(session, user.id, subject_id))
+    if not payloads:
         raise HTTPException(status_code=404, detail="Предмет не найден")
-
-    subject_dict = {
-        "id": subject.id,
-        "name": subject.name,
-        "user_id": subject.user_id,
-        "activities": [
-            ActivityRead.model_validate(a) for a in getattr(subject, "activities", [])
-        ]
-    }
-    return SubjectRead.model_validate(subject_dict)
+    return Response(content=to_json(payloads[0]), media_type="application/json", headers=headers)
 
 
 @router.post("/{subject_id}/activity-add", response_model=ActivityRead)
@@ -130,8 +697,16 @@ async def add_activity_to_subject(
     if not res.scalar_one_or_none():
         raise HTTPException(status_code=404, detail="Предмет не найден")
 
-    new_act = Activity(**activity_data.model_dump(), subject_id=subject_id)
+    version = await SubjectsVersion.bump(session, user.id)
+    new_act = Activity(**activity_data.model_dump(), subject_id=subject_id, change_seq=version)
     session.add(new_act)
+    await session.flush()
+    await Subject.apply_counter_deltas(session, {
+        subject_id: Subject.counter_delta(None, (new_act.current_progress, new_act.max_progress)),
+    })
+    await _record_progress(session, user, [_progress_event(
+        ProgressEvent.ADD, subject_id, new_act.id, new_act.current_progress or 0, new_act.max_progress or 0,
+    )])
     await session.commit()
     await session.refresh(new_act)
     return ActivityRead.model_validate(new_act)
@@ -143,18 +718,17 @@ async def delete_activity(
         user: User = Depends(current_active_user),
         session: AsyncSession = Depends(db_helper.session_getter)
 ):
-    stmt = (
-        select(Activity)
-        .join(Subject)
-        .where(Activity.id == activity_id, Subject.user_id == user.id)
-    )
-    result = await session.execute(stmt)
-    activity = result.scalar_one_or_none()
-
-    if not activity:
+    version = await SubjectsVersion.bump(session, user.id)
+    deleted = await _delete_activity_row(session, activity_id, user.id)
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Активность не найдена или доступ запрещен")
 
-    await session.delete(activity)
+    subject_id, current, maximum = deleted
+    await Subject.apply_counter_deltas(session, {subject_id: Subject.counter_delta((current, maximum), None)})
+    await Tombstone.record(session, user.id, Tombstone.ACTIVITY, [activity_id], version)
+    await _record_progress(session, user, [_progress_event(
+        ProgressEvent.DELETE, subject_id, activity_id, -current, -maximum,
+    )])
     await session.commit()
     return None
 
@@ -162,24 +736,22 @@ async def delete_activity(
 @router.patch("/activities/{activity_id}/plus", response_model=ActivityRead)
 async def increment_activity_progress(
         activity_id: int,
+        step: int = Query(1, ge=1),
         user: User = Depends(current_active_user),
         session: AsyncSession = Depends(db_helper.session_getter)
 ):
-    stmt = (
-        select(Activity)
-        .join(Subject)
-        .where(Activity.id == activity_id, Subject.user_id == user.id)
-    )
-    result = await session.execute(stmt)
-    activity = result.scalar_one_or_none()
+    version = await SubjectsVersion.bump(session, user.id)
+    changed = await _change_activity_progress(session, activity_id, user.id, step, version)
 
-    if not activity:
+    if not changed:
         raise HTTPException(status_code=404, detail="Активность не найдена")
 
-    if activity.current_progress < activity.max_progress:
-        activity.current_progress += 1
-        await session.commit()
-        await session.refresh(activity)
+    activity, applied = changed
+    await Subject.apply_counter_deltas(session, {activity.subject_id: _progress_counter_delta(activity, applied)})
+    await _record_progress(session, user, [_progress_event(
+        ProgressEvent.PLUS, activity.subject_id, activity_id, applied,
+    )])
+    await session.commit()
 
     return ActivityRead.model_validate(activity)
 
@@ -187,23 +759,21 @@ async def increment_activity_progress(
 @router.patch("/activities/{activity_id}/minus", response_model=ActivityRead)
 async def decrement_activity_progress(
         activity_id: int,
+        step: int = Query(1, ge=1),
         user: User = Depends(current_active_user),
         session: AsyncSession = Depends(db_helper.session_getter)
 ):
-    stmt = (
-        select(Activity)
-        .join(Subject)
-        .where(Activity.id == activity_id, Subject.user_id == user.id)
-    )
-    result = await session.execute(stmt)
-    activity = result.scalar_one_or_none()
+    version = await SubjectsVersion.bump(session, user.id)
+    changed = await _change_activity_progress(session, activity_id, user.id, -step, version)
 
-    if not activity:
+    if not changed:
         raise HTTPException(status_code=404, detail="Активность не найдена")
 
-    if activity.current_progress > 0:
-        activity.current_progress -= 1
-        await session.commit()
-        await session.refresh(activity)
+    activity, applied = changed
+    await Subject.apply_counter_deltas(session, {activity.subject_id: _progress_counter_delta(activity, applied)})
+    await _record_progress(session, user, [_progress_event(
+        ProgressEvent.MINUS, activity.subject_id, activity_id, applied,
+    )])
+    await session.commit()
 
     return ActivityRead.model_validate(activity)
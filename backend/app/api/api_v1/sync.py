@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.authentication.fastapi_users import current_active_user
+from core.authentication.token_cache import token_cache
+from core.config import settings
+from core.models import User, db_helper, SyncJob
+from core.schemas.syncGroup import SyncGroupRequest, SyncJobRead
+from services.sync_worker import sync_worker
+from services.unversity import uni_service
+
+router = APIRouter(
+    prefix=settings.api.v1.sync,
+    tags=["University sync"]
+)
+
+
+@router.get("/status", response_model=SyncJobRead)
+async def get_sync_status(
+        user: User = Depends(current_active_user),
+        session: AsyncSession = Depends(db_helper.session_getter)
+):
+    stmt = (
+        select(SyncJob)
+        .where(SyncJob.user_id == user.id)
+        .order_by(SyncJob.id.desc())
+        .limit(1)
+    )
+    job = (await session.execute(stmt)).scalar_one_or_none()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Синхронизация ещё не запускалась")
+
+    return SyncJobRead.model_validate(job)
+
+
+@router.post("", response_model=SyncJobRead, status_code=status.HTTP_202_ACCEPTED)
+async def request_sync(
+        data: SyncGroupRequest,
+        user: User = Depends(current_active_user),
+        session: AsyncSession = Depends(db_helper.session_getter)
+):
+    """Меняет группу пользователя и ставит повторный импорт предметов в очередь."""
+    stmt = select(SyncJob).where(
+        SyncJob.user_id == user.id,
+        SyncJob.status.in_((SyncJob.PENDING, SyncJob.RUNNING)),
+    )
+    job = (await session.execute(stmt)).scalars().first()
+    # группа из БД: снимок пользователя в кэше или токене может быть устаревшим
+    stored_group = await session.scalar(select(User.group_name).where(User.id == user.id))
+
+    if job and stored_group == data.group_name:
+        return SyncJobRead.model_validate(job)
+
+    await session.execute(
+        update(User).where(User.id == user.id).values(group_name=data.group_name)
+    )
+    job = await sync_worker.enqueue(session, user.id)
+    await session.commit()
+    await session.refresh(job)
+
+    await token_cache.invalidate_user(user.id)
+    sync_worker.wake()
+    return SyncJobRead.model_validate(job)
+
+
+@router.get("/upstream")
+async def get_upstream_health(
+        user: User = Depends(current_active_user),
+):
+    """Состояние интеграции с ruz.spbstu.ru для мониторинга: circuit breaker, задержки, объединение запросов."""
+    return uni_service.health()
@@ -2,12 +2,13 @@ __all__ = (
     "get_access_tokens_db",
     "authentication_backend",
     "get_database_strategy",
+    "get_signed_token_strategy",
     "get_user_manager",
     "get_users_db",
 )
 
 from .access_tokens import get_access_tokens_db
 from .backend import authentication_backend
-from .strategy import get_database_strategy
+from .strategy import get_database_strategy, get_signed_token_strategy
 from .user_manager import get_user_manager
 from .users import get_users_db
\ No newline at end of file
@@ -4,11 +4,19 @@ from core.authentication.transport import (
     bearer_transport,
 
 )
-from .strategy import get_database_strategy
+from core.config import settings
+from .strategy import get_database_strategy, get_signed_token_strategy
 
-authentication_backend = AuthenticationBackend(
-    name="access-tokens-db",
-    transport=bearer_transport,
-    # transport=cookie_transport,
-    get_strategy=get_database_strategy,
-)
\ No newline at end of file
+if settings.auth.strategy == "jwt":
+    authentication_backend = AuthenticationBackend(
+        name="signed-tokens",
+        transport=bearer_transport,
+        get_strategy=get_signed_token_strategy,
+    )
+else:
+    authentication_backend = AuthenticationBackend(
+        name="access-tokens-db",
+        transport=bearer_transport,
+        # transport=cookie_transport,
+        get_strategy=get_database_strategy,
+    )
\ No newline at end of file
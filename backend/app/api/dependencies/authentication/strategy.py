@@ -4,10 +4,10 @@ from typing import (
 )
 
 from fastapi import Depends
-from fastapi_users.authentication.strategy.db import (
-    DatabaseStrategy,
-)
 
+from core.authentication.revocation import revocation_list
+from core.authentication.strategy import CachedDatabaseStrategy, SignedTokenStrategy
+from core.authentication.token_cache import token_cache
 from core.config import settings
 from .access_tokens import get_access_tokens_db
 
@@ -21,8 +21,20 @@ def get_database_strategy(
         "AccessTokenDatabase[AccessToken]",
         Depends(get_access_tokens_db),
     ],
-) -> DatabaseStrategy:
-    return DatabaseStrategy(
+) -> CachedDatabaseStrategy:
+    return CachedDatabaseStrategy(
         database=access_tokens_db,
+        cache=token_cache,
+        cache_ttl_seconds=settings.auth_cache.ttl_seconds,
         lifetime_seconds=settings.access_token.lifetime_seconds,
-    )
\ No newline at end of file
+    )
+
+
+def get_signed_token_strategy() -> SignedTokenStrategy:
+    if not settings.auth.jwt_secret:
+        raise RuntimeError("auth.jwt_secret не задан для стратегии jwt")
+    return SignedTokenStrategy(
+        secret=settings.auth.jwt_secret,
+        lifetime_seconds=settings.auth.jwt_lifetime_seconds,
+        revocation=revocation_list,
+    )
@@ -0,0 +1,106 @@
+import heapq
+import time
+from typing import Protocol
+
+from core.config import settings
+
+
+class RevocationList(Protocol):
+    """
+    Список отозванных подписанных токенов.
+    Хранит jti только до истечения самого токена, плюс метку "всё, что выдано раньше,
+    недействительно" для каждого пользователя - этого хватает для logout и смены данных.
+    """
+
+    async def revoke(self, jti: str, expires_at: float) -> None: ...
+
+    async def revoke_user(self, user_id: int) -> None: ...
+
+    async def is_revoked(self, jti: str, user_id: int, issued_at: float) -> bool: ...
+
+
+class MemoryRevocationList:
+    """Список в памяти процесса. Подходит только для одного воркера (см. create_revocation_list)."""
+
+    def __init__(self, token_lifetime_seconds: int):
+        self.token_lifetime_seconds = token_lifetime_seconds
+        self._revoked: dict[str, float] = {}
+        self._expiry_heap: list[tuple[float, str]] = []
+        self._revoked_before: dict[int, float] = {}
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        self._prune()
+        self._revoked[jti] = expires_at
+        heapq.heappush(self._expiry_heap, (expires_at, jti))
+
+    async def revoke_user(self, user_id: int) -> None:
+        self._revoked_before[user_id] = time.time()
+
+    async def is_revoked(self, jti: str, user_id: int, issued_at: float) -> bool:
+        revoked_before = self._revoked_before.get(user_id)
+        if revoked_before is not None:
+            if revoked_before + self.token_lifetime_seconds < time.time():
+                # все токены, выданные до отзыва, уже истекли сами
+                del self._revoked_before[user_id]
+            elif issued_at < revoked_before:
+                return True
+        return jti in self._revoked
+
+    def _prune(self) -> None:
+        now = time.time()
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, jti = heapq.heappop(self._expiry_heap)
+            self._revoked.pop(jti, None)
+
+
+class RedisRevocationList:
+    """Общий для всех воркеров список в Redis; записи удаляются самим Redis по истечении токена."""
+
+    jti_prefix = "auth:revoked:"
+    user_prefix = "auth:revoked-before:"
+
+    def __init__(self, url: str, token_lifetime_seconds: int):
+        self.token_lifetime_seconds = token_lifetime_seconds
+        try:
+            from redis import asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError(
+                "Для auth_cache.backend=redis нужен пакет redis"
+            ) from e
+        self.redis = aioredis.from_url(url, decode_responses=True)
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        await self.redis.set(self.jti_prefix + jti, 1, pxat=int(expires_at * 1000))
+
+    async def revoke_user(self, user_id: int) -> None:
+        await self.redis.set(
+            f"{self.user_prefix}{user_id}",
+            time.time(),
+            ex=self.token_lifetime_seconds,
+        )
+
+    async def is_revoked(self, jti: str, user_id: int, issued_at: float) -> bool:
+        revoked, revoked_before = await self.redis.mget(
+            self.jti_prefix + jti,
+            f"{self.user_prefix}{user_id}",
+        )
+        if revoked is not None:
+            return True
+        return revoked_before is not None and issued_at < float(revoked_before)
+
+
+def create_revocation_list() -> RevocationList:
+    lifetime = settings.auth.jwt_lifetime_seconds
+    if settings.auth_cache.backend == "redis":
+        if not settings.auth_cache.redis_url:
+            raise RuntimeError("auth_cache.redis_url не задан")
+        return RedisRevocationList(url=settings.auth_cache.redis_url, token_lifetime_seconds=lifetime)
+    # logout в одном воркере не виден остальным: отозванный токен жил бы до истечения
+    if settings.auth.strategy == "jwt" and settings.db.workers > 1:
+        raise RuntimeError(
+            "auth.strategy=jwt при нескольких воркерах требует auth_cache.backend=redis"
+        )
+    return MemoryRevocationList(token_lifetime_seconds=lifetime)
+
+
+revocation_list = create_revocation_list()
@@ -0,0 +1,163 @@
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any
+
+import jwt
+from fastapi_users import exceptions
+from fastapi_users.authentication import JWTStrategy
+from fastapi_users.authentication.strategy.db import DatabaseStrategy
+from fastapi_users.jwt import decode_jwt
+from sqlalchemy.orm import make_transient_to_detached
+
+from core.models import User
+from .revocation import RevocationList
+from .token_cache import TokenCache
+
+if TYPE_CHECKING:
+    from fastapi_users import BaseUserManager
+    from fastapi_users.authentication.strategy.db import AccessTokenDatabase
+    from core.models import AccessToken
+
+
+# поля, которые нужны авторизации и обработчикам запросов; hashed_password в кэш и токены не попадает
+CACHED_USER_FIELDS = (
+    "id",
+    "email",
+    "is_active",
+    "is_superuser",
+    "is_verified",
+    "group_name",
+    "group_id",
+)
+
+
+def user_to_cache(user: User) -> dict[str, Any]:
+    return {field: getattr(user, field) for field in CACHED_USER_FIELDS}
+
+
+def user_from_cache(data: dict[str, Any]) -> User:
+    # каждый запрос получает собственный detached-объект, а не общий экземпляр из кэша;
+    # незакэшированные колонки не загружены, и обращение к ним бросает DetachedInstanceError
+    # (сессии нет, ленивой загрузки не будет) - поля для UserRead и обработчиков есть в CACHED_USER_FIELDS
+    user = User(**data)
+    make_transient_to_detached(user)
+    return user
+
+
+class CachedDatabaseStrategy(DatabaseStrategy):
+    """
+    DatabaseStrategy с кэшем token -> user перед таблицей access_tokens.
+    На попадании в кэш запрос не делает ни одного SQL-запроса для авторизации.
+    """
+
+    def __init__(
+        self,
+        database: "AccessTokenDatabase[AccessToken]",
+        cache: TokenCache,
+        cache_ttl_seconds: int,
+        lifetime_seconds: int | None = None,
+    ):
+        super().__init__(database=database, lifetime_seconds=lifetime_seconds)
+        self.cache = cache
+        self.cache_ttl_seconds = cache_ttl_seconds
+
+    async def read_token(
+        self,
+        token: str | None,
+        user_manager: "BaseUserManager[User, int]",
+    ) -> User | None:
+        if token is None:
+            return None
+
+        cached = await self.cache.get(token)
+        if cached is not None:
+            return user_from_cache(cached)
+
+        now = datetime.now(timezone.utc)
+        max_age = None
+        if self.lifetime_seconds:
+            max_age = now - timedelta(seconds=self.lifetime_seconds)
+
+        access_token = await self.database.get_by_token(token, max_age)
+        if access_token is None:
+            return None
+
+        try:
+            parsed_id = user_manager.parse_id(access_token.user_id)
+            user = await user_manager.get(parsed_id)
+        except (exceptions.UserNotExists, exceptions.InvalidID):
+            return None
+
+        ttl = float(self.cache_ttl_seconds)
+        if self.lifetime_seconds:
+            expires_at = access_token.created_at + timedelta(seconds=self.lifetime_seconds)
+            ttl = min(ttl, (expires_at - now).total_seconds())
+        await self.cache.set(token, user.id, user_to_cache(user), ttl)
+
+        return user
+
+    async def destroy_token(self, token: str, user: User) -> None:
+        await self.cache.delete(token)
+        await super().destroy_token(token, user)
+
+
+class SignedTokenStrategy(JWTStrategy):
+    """
+    Stateless-стратегия: короткоживущий подписанный токен несёт снимок пользователя,
+    поэтому проверка не трогает пул соединений. Logout и смена данных пользователя
+    отзывают токены через компактный RevocationList.
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        lifetime_seconds: int,
+        revocation: RevocationList,
+    ):
+        super().__init__(secret=secret, lifetime_seconds=lifetime_seconds)
+        self.revocation = revocation
+
+    def _decode(self, token: str) -> dict[str, Any] | None:
+        try:
+            return decode_jwt(
+                token, self.decode_key, self.token_audience, algorithms=[self.algorithm]
+            )
+        except jwt.PyJWTError:
+            return None
+
+    async def read_token(
+        self,
+        token: str | None,
+        user_manager: "BaseUserManager[User, int]",
+    ) -> User | None:
+        if token is None:
+            return None
+
+        data = self._decode(token)
+        if data is None or "usr" not in data:
+            return None
+
+        user_data = data["usr"]
+        if await self.revocation.is_revoked(data["jti"], user_data["id"], data["iat"]):
+            return None
+
+        return user_from_cache(user_data)
+
+    async def write_token(self, user: User) -> str:
+        issued_at = time.time()
+        user_data = user_to_cache(user)
+        payload = {
+            "sub": str(user.id),
+            "aud": self.token_audience,
+            "jti": secrets.token_urlsafe(16),
+            "iat": issued_at,
+            "exp": int(issued_at) + self.lifetime_seconds,
+            "usr": user_data,
+        }
+        return jwt.encode(payload, self.encode_key, algorithm=self.algorithm)
+
+    async def destroy_token(self, token: str, user: User) -> None:
+        data = self._decode(token)
+        if data is not None:
+            await self.revocation.revoke(data["jti"], data["exp"])
@@ -0,0 +1,151 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Protocol
+
+from core.config import settings
+
+
+class TokenCache(Protocol):
+    """
+    Кэш token -> снимок полей пользователя.
+    Значение - словарь колонок User, из которого стратегия собирает объект заново.
+    """
+
+    async def get(self, token: str) -> dict[str, Any] | None: ...
+
+    async def set(self, token: str, user_id: int, data: dict[str, Any], ttl: float) -> None: ...
+
+    async def delete(self, token: str) -> None: ...
+
+    async def invalidate_user(self, user_id: int) -> None: ...
+
+
+class NullTokenCache:
+    async def get(self, token: str) -> dict[str, Any] | None:
+        return None
+
+    async def set(self, token: str, user_id: int, data: dict[str, Any], ttl: float) -> None:
+        pass
+
+    async def delete(self, token: str) -> None:
+        pass
+
+    async def invalidate_user(self, user_id: int) -> None:
+        pass
+
+
+class MemoryTokenCache:
+    """
+    LRU-кэш в памяти процесса с TTL на каждую запись.
+    Инвалидация видна только текущему воркеру, поэтому годится только для одного воркера.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        # token -> (expires_at, user_id, data)
+        self._entries: OrderedDict[str, tuple[float, int, dict[str, Any]]] = OrderedDict()
+        self._tokens_by_user: dict[int, set[str]] = {}
+
+    async def get(self, token: str) -> dict[str, Any] | None:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        expires_at, _, data = entry
+        if expires_at <= time.monotonic():
+            self._drop(token)
+            return None
+        self._entries.move_to_end(token)
+        return data
+
+    async def set(self, token: str, user_id: int, data: dict[str, Any], ttl: float) -> None:
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        self._drop(token)
+        self._entries[token] = (time.monotonic() + ttl, user_id, data)
+        self._tokens_by_user.setdefault(user_id, set()).add(token)
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+
+    async def delete(self, token: str) -> None:
+        self._drop(token)
+
+    async def invalidate_user(self, user_id: int) -> None:
+        for token in self._tokens_by_user.pop(user_id, set()):
+            self._entries.pop(token, None)
+
+    def _drop(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry[1])
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry[1]]
+
+
+class RedisTokenCache:
+    """
+    Общий для всех воркеров кэш в Redis. Требует пакет redis (redis.asyncio).
+    Размер ограничивается политикой вытеснения самого Redis (maxmemory-policy allkeys-lru).
+    """
+
+    key_prefix = "auth:token:"
+    user_prefix = "auth:user-tokens:"
+
+    def __init__(self, url: str, max_ttl: float):
+        # индекс токенов пользователя живёт не меньше самой долгой записи
+        self.max_ttl_ms = int(max_ttl * 1000)
+        try:
+            from redis import asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError(
+                "Для auth_cache.backend=redis нужен пакет redis"
+            ) from e
+        self.redis = aioredis.from_url(url, decode_responses=True)
+
+    async def get(self, token: str) -> dict[str, Any] | None:
+        raw = await self.redis.get(self.key_prefix + token)
+        return json.loads(raw) if raw else None
+
+    async def set(self, token: str, user_id: int, data: dict[str, Any], ttl: float) -> None:
+        ttl_ms = int(ttl * 1000)
+        if ttl_ms <= 0:
+            return
+        user_key = f"{self.user_prefix}{user_id}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(self.key_prefix + token, json.dumps(data), px=ttl_ms)
+            pipe.sadd(user_key, token)
+            pipe.pexpire(user_key, self.max_ttl_ms)
+            await pipe.execute()
+
+    async def delete(self, token: str) -> None:
+        await self.redis.delete(self.key_prefix + token)
+
+    async def invalidate_user(self, user_id: int) -> None:
+        user_key = f"{self.user_prefix}{user_id}"
+        tokens = await self.redis.smembers(user_key)
+        keys = [self.key_prefix + t for t in tokens]
+        await self.redis.delete(user_key, *keys)
+
+
+def create_token_cache() -> TokenCache:
+    config = settings.auth_cache
+    if config.backend == "memory":
+        # инвалидация видна только своему воркеру: остальные отдавали бы
+        # устаревшего или деактивированного пользователя до ttl_seconds
+        if settings.db.workers > 1:
+            raise RuntimeError(
+                "auth_cache.backend=memory при нескольких воркерах недопустим: нужен redis или none"
+            )
+        return MemoryTokenCache(max_size=config.max_size)
+    if config.backend == "redis":
+        if not config.redis_url:
+            raise RuntimeError("auth_cache.redis_url не задан")
+        return RedisTokenCache(url=config.redis_url, max_ttl=config.ttl_seconds)
+    return NullTokenCache()
+
+
+token_cache = create_token_cache()
@@ -1,5 +1,5 @@
 import logging
-from typing import Optional, TYPE_CHECKING
+from typing import Any, Optional, TYPE_CHECKING
 
 #from fastapi_cache import FastAPICache
 from fastapi_users import (
@@ -10,8 +10,10 @@ from fastapi_users.db import BaseUserDatabase
 
 from core.config import settings
 from core.types.user_id import UserIdType
-from core.models import User, Subject
-from services.unversity import uni_service
+from core.models import User
+from services.sync_worker import sync_worker
+from .revocation import revocation_list
+from .token_cache import token_cache
 
 #from mailing.send_email_confirmed import send_email_confirmed
 #from mailing.send_verification_email import send_verification_email
@@ -38,26 +40,37 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, UserIdType]):
         self.background_tasks = background_tasks
 
     async def on_after_register(self, user: User, request: Optional[Request] = None):
+        # Группа и предметы подтягиваются фоновой задачей, регистрация не ждёт ruz.spbstu.ru.
+        # Ход синхронизации доступен через GET /sync/status.
         session = self.user_db.session
-        try:
-            ext_group_id = await uni_service.get_group_id_by_number(user.group_name)
+        await sync_worker.enqueue(session, user.id)
+        await session.commit()
+        sync_worker.wake()
 
-            user.group_id = str(ext_group_id)
+    # изменения, после которых выданные токены больше не должны действовать
+    credential_fields = frozenset({"password", "email", "is_active"})
 
-            subjects_names = await uni_service.get_subjects_list(ext_group_id)
+    async def _invalidate_sessions(self, user: User):
+        await token_cache.invalidate_user(user.id)
+        await revocation_list.revoke_user(user.id)
 
-            for name in subjects_names:
-                new_subject = Subject(name=name, user_id=user.id)
-                session.add(new_subject)
-
-            await session.commit()
+    async def on_after_update(
+        self,
+        user: User,
+        update_dict: dict[str, Any],
+        request: Optional[Request] = None,
+    ):
+        if self.credential_fields & update_dict.keys():
+            await self._invalidate_sessions(user)
+        else:
+            # остальные правки профиля не разлогинивают, но снимок в кэше устарел
+            await token_cache.invalidate_user(user.id)
 
-        except Exception as e:
-            await session.rollback()
-            await session.delete(user)
-            await session.commit()
+    async def on_after_reset_password(self, user: User, request: Optional[Request] = None):
+        await self._invalidate_sessions(user)
 
-            raise e
+    async def on_after_delete(self, user: User, request: Optional[Request] = None):
+        await self._invalidate_sessions(user)
 
     # async def on_after_forgot_password(
     #     self,
@@ -1,17 +1,64 @@
+import logging
+import os
+from typing import Literal
+
 from pydantic import BaseModel
 from pydantic import PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+LOG_DEFAULT_FORMAT = "[%(asctime)s] %(module)10s:%(lineno)-3d %(levelname)-7s - %(message)s"
+
+
 class RunConfig(BaseModel):
     host: str = "127.0.0.1"
     port: int = 8000
 
+class GunicornConfig(BaseModel):
+    host: str = "0.0.0.0"
+    port: int = 8000
+    # 0 - по числу доступных процессу ядер
+    workers: int = 0
+    timeout: int = 60
+    # сколько ждать завершения текущих запросов при остановке/перезапуске воркера
+    graceful_timeout: int = 30
+    keepalive: int = 5
+    # воркер перезапускается после max_requests + random(0..max_requests_jitter) запросов,
+    # чтобы утечки памяти не копились и воркеры не перезапускались одновременно
+    max_requests: int = 10_000
+    max_requests_jitter: int = 1_000
+    # приложение импортируется в мастере до fork - воркеры стартуют быстрее и делят память
+    preload: bool = True
+
+    def worker_count(self) -> int:
+        if self.workers > 0:
+            return self.workers
+        if hasattr(os, "sched_getaffinity"):
+            # учитывает ограничение по cpuset в контейнере
+            return max(1, len(os.sched_getaffinity(0)))
+        return os.cpu_count() or 1
+
+class LoggingConfig(BaseModel):
+    log_level: Literal[
+        "debug",
+        "info",
+        "warning",
+        "error",
+        "critical",
+    ] = "info"
+    log_format: str = LOG_DEFAULT_FORMAT
+
+    @property
+    def log_level_value(self) -> int:
+        return logging.getLevelNamesMapping()[self.log_level.upper()]
+
 class ApiV1Prefix(BaseModel):
     prefix: str = "/v1"
     auth: str = "/auth"
     users: str = "/users"
     subjects: str = "/subjects"
+    sync: str = "/sync"
+    leaderboard: str = "/leaderboard"
 
 
 
@@ -34,6 +81,20 @@ class DatabaseConfig(BaseModel):
     echo_pool: bool = False
     max_overflow: int = 10
     pool_size: int = 50
+    # сколько ждать свободного соединения, прежде чем вернуть ошибку
+    pool_timeout: float = 10.0
+    # пересоздавать соединения старше pool_recycle секунд (-1 - никогда)
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    # кэш подготовленных запросов asyncpg; 0 - для pgbouncer в режиме transaction
+    statement_cache_size: int = 100
+    # общий лимит соединений приложения к Postgres, делится между workers процессами;
+    # pool_size и max_overflow служат верхней границей на процесс. По умолчанию
+    # с запасом под max_connections=100 самого Postgres (служебные и ручные подключения)
+    max_connections: int | None = 80
+    workers: int = 1
+    # сколько соединений открыть при старте, чтобы первые запросы не ждали подключения
+    pool_warmup: int = 5
 
     naming_convention: dict[str, str] = {
         "ix": "ix_%(column_0_label)s",
@@ -43,11 +104,90 @@ class DatabaseConfig(BaseModel):
         "pk": "pk_%(table_name)s",
     }
 
+    def pool_limits(self) -> tuple[int, int]:
+        """(pool_size, max_overflow) одного процесса с учётом max_connections / workers."""
+        if self.max_connections is None:
+            return self.pool_size, self.max_overflow
+        per_worker = max(1, self.max_connections // max(1, self.workers))
+        pool_size = min(self.pool_size, per_worker)
+        max_overflow = min(self.max_overflow, per_worker - pool_size)
+        return pool_size, max_overflow
+
 class AccessToken(BaseModel):
     lifetime_seconds: int = 3600
     reset_password_token_secret: str
     verification_token_secret: str
 
+class AuthConfig(BaseModel):
+    # database - токены в таблице access_tokens,
+    # jwt - подписанные короткоживущие токены, проверяются без обращения к БД
+    strategy: Literal["database", "jwt"] = "database"
+    jwt_secret: str | None = None
+    jwt_lifetime_seconds: int = 900
+
+class AuthCacheConfig(BaseModel):
+    # memory - LRU в процессе воркера (только при одном воркере), redis - общий кэш, none - без кэша;
+    # по умолчанию none: gunicorn по умолчанию запускает воркер на каждое ядро
+    backend: Literal["memory", "redis", "none"] = "none"
+    # верхняя граница, дополнительно ограничена access_token.lifetime_seconds
+    ttl_seconds: int = 60
+    max_size: int = 10_000
+    redis_url: str | None = None
+
+class UniversityApiConfig(BaseModel):
+    base_url: str = "https://ruz.spbstu.ru/api/v1/ruz"
+    connect_timeout: float = 5.0
+    read_timeout: float = 10.0
+    pool_timeout: float = 5.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    # включается, только если установлен пакет h2
+    http2: bool = True
+    # сколько недель расписания смотреть при импорте предметов:
+    # 2 - две недели в середине семестра, больше - равномерно по всему семестру
+    semester_weeks: int = 2
+    fetch_concurrency: int = 4
+    # ограничение на один запрос недели целиком, включая ожидание соединения
+    week_timeout: float = 15.0
+    # кэш недель расписания в БД: свежая запись отдаётся как есть,
+    # устаревшая (до schedule_max_stale_seconds) - сразу, с фоновым обновлением
+    schedule_cache_enabled: bool = True
+    schedule_ttl_seconds: int = 6 * 3600
+    schedule_max_stale_seconds: int = 7 * 24 * 3600
+    # circuit breaker: после breaker_failure_threshold ошибок подряд запросы
+    # не отправляются breaker_reset_timeout_seconds, затем идёт пробный запрос
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout_seconds: float = 30.0
+    breaker_half_open_max_calls: int = 1
+    # таймаут чтения = p95 задержки * adaptive_timeout_factor, но не меньше
+    # adaptive_timeout_min и не больше read_timeout
+    adaptive_timeout_min: float = 1.0
+    adaptive_timeout_factor: float = 3.0
+
+class SyncConfig(BaseModel):
+    # фоновая синхронизация с ruz.spbstu.ru
+    enabled: bool = True
+    poll_interval_seconds: float = 5.0
+    batch_size: int = 10
+    max_attempts: int = 5
+    backoff_base_seconds: float = 10.0
+    backoff_max_seconds: float = 600.0
+    lease_seconds: int = 120
+
+class ProgressRollupConfig(BaseModel):
+    # свёртка журнала прогресса в дневные суммы
+    enabled: bool = True
+    interval_seconds: float = 60.0
+    batch_size: int = 5000
+    # границы дня для графиков; по умолчанию московское время (без перехода на летнее)
+    utc_offset_hours: int = 3
+
+class MetricsConfig(BaseModel):
+    # общий каталог для снимков метрик воркеров gunicorn; пусто - один процесс
+    multiproc_dir: str | None = None
+    flush_interval_seconds: float = 5.0
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=(".env.template", ".env"),
@@ -56,8 +196,16 @@ class Settings(BaseSettings):
         env_prefix="APP_CONFIG__",
     )
     run: RunConfig = RunConfig()
+    gunicorn: GunicornConfig = GunicornConfig()
+    logging: LoggingConfig = LoggingConfig()
     api: ApiPrefix = ApiPrefix()
     db: DatabaseConfig
     access_token: AccessToken
+    auth: AuthConfig = AuthConfig()
+    auth_cache: AuthCacheConfig = AuthCacheConfig()
+    sync: SyncConfig = SyncConfig()
+    progress_rollup: ProgressRollupConfig = ProgressRollupConfig()
+    university: UniversityApiConfig = UniversityApiConfig()
+    metrics: MetricsConfig = MetricsConfig()
 
 settings = Settings()
\ No newline at end of file
@@ -1,3 +1,5 @@
+from typing import Callable
+
 from .logger import GunicornLogger
 
 
@@ -7,6 +9,12 @@ def get_app_options(
     timeout: int,
     workers: int,
     log_level: str,
+    graceful_timeout: int = 30,
+    keepalive: int = 5,
+    max_requests: int = 0,
+    max_requests_jitter: int = 0,
+    preload_app: bool = False,
+    on_starting: Callable | None = None,
 ) -> dict:
     return {
         "accesslog": "-",
@@ -15,6 +23,12 @@ def get_app_options(
         "loglevel": log_level,
         "logger_class": GunicornLogger,
         "timeout": timeout,
+        "graceful_timeout": graceful_timeout,
+        "keepalive": keepalive,
+        "max_requests": max_requests,
+        "max_requests_jitter": max_requests_jitter,
+        "preload_app": preload_app,
+        "on_starting": on_starting,
         "workers": workers,
         "worker_class": "uvicorn.workers.UvicornWorker",
-    }
\ No newline at end of file
+    }
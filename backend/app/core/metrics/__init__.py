@@ -0,0 +1,22 @@
+__all__ = (
+    "registry",
+    "exporter",
+    "Registry",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsExporter",
+    "MetricsMiddleware",
+    "current_route",
+)
+
+from core.config import settings
+from .registry import Registry, Counter, Gauge, Histogram
+from .context import current_route
+
+registry = Registry()
+
+from .http import MetricsMiddleware
+from .multiprocess import MetricsExporter
+
+exporter = MetricsExporter(registry, settings.metrics)
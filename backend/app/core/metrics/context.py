@@ -0,0 +1,12 @@
+from contextvars import ContextVar
+
+NO_ROUTE = "-"
+UNMATCHED_ROUTE = "<unmatched>"
+
+# шаблон пути текущего запроса; метрики глубже по стеку (SQL, пул) берут метку отсюда
+_current_route: ContextVar[str] = ContextVar("metrics_current_route", default=NO_ROUTE)
+
+
+def current_route() -> str:
+    """Шаблон пути текущего запроса, например /v1/subjects/{subject_id}; вне запроса - "-"."""
+    return _current_route.get()
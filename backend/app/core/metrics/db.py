@@ -0,0 +1,73 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .context import current_route
+from . import registry
+
+POOL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+pool_checkout_seconds = registry.histogram(
+    "db_pool_checkout_seconds",
+    "Ожидание соединения из пула, включая установку нового соединения",
+    labelnames=("route",),
+    buckets=POOL_BUCKETS,
+)
+pool_in_use = registry.gauge("db_pool_in_use", "Соединения, выданные из пула")
+pool_overflow = registry.gauge("db_pool_overflow", "Соединения сверх pool_size")
+pool_size = registry.gauge("db_pool_size", "Размер пула")
+query_seconds = registry.histogram(
+    "db_query_seconds",
+    "Время выполнения SQL-запроса",
+    labelnames=("route", "operation"),
+)
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, который замеряет, сколько запрос ждал соединение."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_seconds.observe(time.perf_counter() - start, route=current_route())
+
+
+def _operation(statement: str) -> str:
+    head = statement.lstrip().split(None, 1)
+    return head[0].upper() if head else "-"
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Подключает к движку метрики пула и задержки каждого SQL-запроса."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["metrics_query_start"].pop()
+        query_seconds.observe(
+            time.perf_counter() - start,
+            route=current_route(),
+            operation=_operation(statement),
+        )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("metrics_query_start"):
+            conn.info["metrics_query_start"].pop()
+
+    def pool_stat(name: str) -> float:
+        method = getattr(engine.pool, name, None)
+        return max(0, method()) if method is not None else 0
+
+    pool_in_use.set_function(lambda: pool_stat("checkedout"))
+    pool_overflow.set_function(lambda: pool_stat("overflow"))
+    pool_size.set_function(lambda: pool_stat("size"))
@@ -0,0 +1,71 @@
+import time
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .context import UNMATCHED_ROUTE, _current_route
+from . import registry
+
+requests_total = registry.counter(
+    "http_requests",
+    "Обработанные HTTP-запросы",
+    labelnames=("route", "method", "status"),
+)
+request_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса, включая сериализацию ответа",
+    labelnames=("route", "method"),
+)
+requests_in_flight = registry.gauge(
+    "http_requests_in_flight",
+    "HTTP-запросы в обработке",
+    labelnames=("route", "method"),
+)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Шаблон пути вместо самого пути, чтобы у метрик было ограниченное число меток.
+    Несовпавшие пути (сканеры, опечатки) собираются под одной меткой.
+    """
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Счётчики, гистограммы задержки и запросы в работе по шаблону маршрута."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope)
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        token = _current_route.set(route)
+        requests_in_flight.inc(route=route, method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_seconds.observe(time.perf_counter() - start, route=route, method=method)
+            requests_in_flight.dec(route=route, method=method)
+            requests_total.inc(route=route, method=method, status=str(status_code))
+            _current_route.reset(token)
@@ -0,0 +1,190 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+from core.config import MetricsConfig
+from .registry import Gauge, Registry
+
+log = logging.getLogger(__name__)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _without_gauges(snapshot: dict) -> dict:
+    return {name: data for name, data in snapshot.items() if data["type"] != Gauge.type}
+
+
+class MetricsExporter:
+    """
+    Отдаёт метрики всех воркеров gunicorn, а не только того, что принял запрос /metrics.
+
+    Каждый процесс раз в flush_interval_seconds записывает снимок своего Registry
+    в multiproc_dir/<pid>.json; при сборе снимки суммируются. Счётчики и гистограммы
+    завершившихся воркеров учитываются и дальше, чтобы суммы не убывали, а их gauge -
+    нет. Снимки завершившихся воркеров сливаются в один aggregate.json (при остановке
+    воркера и при сборе), поэтому число файлов не растёт с перезапусками по max_requests.
+    Каталог очищается перед запуском мастер-процесса (MetricsExporter.clear).
+    Без multiproc_dir отдаются метрики только текущего процесса.
+    """
+
+    suffix = ".json"
+    aggregate_name = "aggregate"
+    lock_name = "exporter.lock"
+
+    def __init__(self, registry: Registry, config: MetricsConfig):
+        self.registry = registry
+        self.config = config
+        self.directory = Path(config.multiproc_dir) if config.multiproc_dir else None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"{os.getpid()}{self.suffix}"
+
+    @property
+    def aggregate_path(self) -> Path:
+        return self.directory / f"{self.aggregate_name}{self.suffix}"
+
+    def write(self) -> None:
+        if self.directory is None:
+            return
+        self._write_snapshot(self.registry.snapshot())
+
+    def _write_snapshot(self, snapshot: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._write_json(self.path, snapshot)
+
+    @staticmethod
+    def _write_json(path: Path, data: dict) -> None:
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, path)
+
+    @contextmanager
+    def _locked(self):
+        """
+        Межпроцессная блокировка каталога: слияние в aggregate.json и удаление снимка
+        должны выглядеть для читателей одним шагом, иначе значения посчитаются дважды.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / self.lock_name, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _load(file: Path) -> dict | None:
+        try:
+            return json.loads(file.read_text())
+        except (OSError, ValueError):
+            log.warning("Skipping unreadable metrics snapshot %s", file)
+            return None
+
+    def _pid_files(self) -> list[Path]:
+        return [file for file in self.directory.glob(f"*{self.suffix}") if file.stem.isdigit()]
+
+    def _fold(self, files: list[Path]) -> None:
+        """Переносит счётчики и гистограммы из снимков files в aggregate.json и удаляет их. Под _locked."""
+        if not files:
+            return
+        snapshots = []
+        if self.aggregate_path.exists():
+            aggregate = self._load(self.aggregate_path)
+            if aggregate is not None:
+                snapshots.append(aggregate)
+        for file in files:
+            snapshot = self._load(file)
+            if snapshot is not None:
+                snapshots.append(_without_gauges(snapshot))
+        self._write_json(self.aggregate_path, Registry.merge_snapshots(snapshots).snapshot())
+        for file in files:
+            file.unlink(missing_ok=True)
+
+    def _read_snapshots(self) -> list[dict]:
+        snapshots = []
+        if self.aggregate_path.exists():
+            aggregate = self._load(self.aggregate_path)
+            if aggregate is not None:
+                snapshots.append(aggregate)
+        for file in self._pid_files():
+            snapshot = self._load(file)
+            if snapshot is not None:
+                snapshots.append(snapshot)
+        return snapshots
+
+    def render(self) -> str:
+        if self.directory is None:
+            return self.registry.render()
+        return self._render_files(self.registry.snapshot())
+
+    async def render_async(self) -> str:
+        """
+        render для обработчика /metrics: свой снимок снимается в цикле событий (метрики
+        меняются только из него), а блокировка каталога и чтение снимков остальных
+        воркеров выполняются в пуле потоков и не задерживают обработку запросов.
+        """
+        if self.directory is None:
+            return self.registry.render()
+        return await asyncio.to_thread(self._render_files, self.registry.snapshot())
+
+    def _render_files(self, own_snapshot: dict) -> str:
+        # свой снимок - самый свежий, остальные отстают не больше чем на flush_interval_seconds
+        self._write_snapshot(own_snapshot)
+        with self._locked():
+            # воркеры, убитые без stop(), оставляют снимки - сливаем их здесь
+            self._fold([file for file in self._pid_files() if not _pid_alive(int(file.stem))])
+            snapshots = self._read_snapshots()
+        return Registry.merge_snapshots(snapshots).render()
+
+    @staticmethod
+    def clear(directory: str) -> None:
+        """Удаляет снимки прошлого запуска; вызывается один раз в мастер-процессе."""
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        for file in path.iterdir():
+            if file.suffix in (MetricsExporter.suffix, ".tmp", ".lock"):
+                file.unlink(missing_ok=True)
+
+    def start(self) -> None:
+        if self.directory is not None and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.directory is None:
+            return
+        # последний снимок сразу уходит в общий aggregate.json, чтобы счётчики не потерялись
+        await asyncio.to_thread(self._write_and_fold, self.registry.snapshot())
+
+    def _write_and_fold(self, own_snapshot: dict) -> None:
+        self._write_snapshot(own_snapshot)
+        with self._locked():
+            self._fold([self.path])
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.flush_interval_seconds)
+            try:
+                await asyncio.to_thread(self._write_snapshot, self.registry.snapshot())
+            except OSError:
+                log.exception("Failed to write metrics snapshot")
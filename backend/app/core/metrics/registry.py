@@ -0,0 +1,288 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Metric(ABC):
+    """Базовая метрика: значения хранятся по кортежу значений меток в порядке labelnames."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: ожидаются метки {self.labelnames}, получены {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterator[tuple[str, tuple[str, ...], LabelValues, float]]:
+        """(имя сэмпла, имена меток, значения меток, значение)."""
+
+    @abstractmethod
+    def dump(self) -> list:
+        """Значения для снимка процесса (Registry.snapshot)."""
+
+    @abstractmethod
+    def merge(self, dumped: list) -> None:
+        """Прибавляет значения из dump() другого процесса."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for sample_name, names, values, value in self.samples():
+            lines.append(f"{sample_name}{_format_labels(names, values)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def dump(self) -> list:
+        return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, dumped: list) -> None:
+        for key, value in dumped:
+            key = tuple(key)
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def samples(self):
+        for key, value in self._values.items():
+            yield f"{self.name}_total", self.labelnames, key, value
+
+
+class Gauge(Metric):
+    """
+    Текущее значение; вместо set/inc можно задать функцию, которая вызывается при сборе.
+    multiprocess_mode - как сводятся значения процессов: sum (соединения в пуле,
+    запросы в работе) или max (флаги 0/1, одинаковые по смыслу во всех воркерах).
+    """
+
+    type = "gauge"
+    modes = ("sum", "max")
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        multiprocess_mode: str = "sum",
+    ):
+        super().__init__(name, documentation, labelnames)
+        if multiprocess_mode not in self.modes:
+            raise ValueError(f"{name}: multiprocess_mode должен быть одним из {self.modes}")
+        self.multiprocess_mode = multiprocess_mode
+        self._values: dict[LabelValues, float] = {}
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    def get(self, **labels: str) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._values.get(self._key(labels), 0.0)
+
+    def dump(self) -> list:
+        if self._function is not None:
+            return [[[], self._function()]]
+        return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, dumped: list) -> None:
+        for key, value in dumped:
+            key = tuple(key)
+            if key not in self._values:
+                self._values[key] = value
+            elif self.multiprocess_mode == "max":
+                self._values[key] = max(self._values[key], value)
+            else:
+                self._values[key] += value
+
+    def samples(self):
+        if self._function is not None:
+            yield self.name, (), (), self._function()
+            return
+        for key, value in self._values.items():
+            yield self.name, self.labelnames, key, value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # по ключу меток: [счётчики корзин (не накопительные)..., +Inf, сумма]
+        self._values: dict[LabelValues, list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        data = self._values.get(key)
+        if data is None:
+            data = self._values[key] = [0.0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                data[i] += 1
+                break
+        else:
+            data[len(self.buckets)] += 1
+        data[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        data = self._values.get(self._key(labels))
+        return int(sum(data[:-1])) if data else 0
+
+    def dump(self) -> list:
+        return [[list(key), list(data)] for key, data in self._values.items()]
+
+    def merge(self, dumped: list) -> None:
+        for key, data in dumped:
+            key = tuple(key)
+            current = self._values.get(key)
+            if current is None:
+                self._values[key] = list(data)
+            else:
+                self._values[key] = [a + b for a, b in zip(current, data)]
+
+    def samples(self):
+        names = self.labelnames + ("le",)
+        for key, data in self._values.items():
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (math.inf,), data[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket", names, key + (_format_value(bound),), cumulative
+            yield f"{self.name}_sum", self.labelnames, key, data[-1]
+            yield f"{self.name}_count", self.labelnames, key, cumulative
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        multiprocess_mode: str = "sum",
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, multiprocess_mode))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> dict:
+        """Состояние всех метрик в виде, пригодном для JSON; см. merge_snapshots."""
+        snapshot = {}
+        for metric in self._metrics.values():
+            data = {
+                "type": metric.type,
+                "help": metric.documentation,
+                "labelnames": list(metric.labelnames),
+                "values": metric.dump(),
+            }
+            if isinstance(metric, Histogram):
+                data["buckets"] = list(metric.buckets)
+            if isinstance(metric, Gauge):
+                data["mode"] = metric.multiprocess_mode
+            snapshot[metric.name] = data
+        return snapshot
+
+    @classmethod
+    def merge_snapshots(cls, snapshots: list[dict]) -> "Registry":
+        """Registry со сводными значениями снимков нескольких процессов (gauge - по своему multiprocess_mode)."""
+        merged = cls()
+        for snapshot in snapshots:
+            for name, data in snapshot.items():
+                metric = merged._metrics.get(name)
+                if metric is None:
+                    labelnames = tuple(data["labelnames"])
+                    if data["type"] == Histogram.type:
+                        metric = merged.histogram(name, data["help"], labelnames, tuple(data["buckets"]))
+                    elif data["type"] == Gauge.type:
+                        metric = merged.gauge(name, data["help"], labelnames, data.get("mode", "sum"))
+                    else:
+                        metric = merged.counter(name, data["help"], labelnames)
+                metric.merge(data["values"])
+        return merged
+
+    def render(self) -> str:
+        """Текст в формате экспозиции Prometheus (text/plain; version=0.0.4)."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
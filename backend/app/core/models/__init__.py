@@ -3,13 +3,29 @@ __all__ = (
     "Base",
     "User",
     "AccessToken",
+    "Group",
+    "GroupSubject",
     "Subject",
     "Activity",
+    "SyncJob",
+    "ScheduleWeek",
+    "SubjectsVersion",
+    "Tombstone",
+    "ProgressEvent",
+    "ProgressDay",
+    "LeaderboardEntry",
 )
 
 from .db_helper import db_helper
 from .base import Base
 from .user import User
 from .access_token import AccessToken
+from .group import Group, GroupSubject
 from .subject import Subject
-from .activity import Activity
\ No newline at end of file
+from .activity import Activity
+from .sync_job import SyncJob
+from .schedule_week import ScheduleWeek
+from .subjects_version import SubjectsVersion
+from .tombstone import Tombstone
+from .progress_event import ProgressEvent, ProgressDay
+from .leaderboard_entry import LeaderboardEntry
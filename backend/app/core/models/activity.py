@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String
+from sqlalchemy import BigInteger, Column, Index, Integer, ForeignKey, String
 from sqlalchemy.orm import relationship
 
 from core.models import Base
@@ -6,6 +6,10 @@ from core.models import Base
 
 class Activity(Base):
     __tablename__ = "activities"
+    __table_args__ = (
+        # selectinload(Subject.activities) и проверки владельца: WHERE subject_id IN (...)
+        Index("ix_activities_subject_id_id", "subject_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     subject_id = Column(Integer, ForeignKey("subjects.id"), nullable=False)
@@ -13,5 +17,7 @@ class Activity(Base):
     name = Column(String, nullable=False)
     current_progress = Column(Integer, default=0)
     max_progress = Column(Integer, default=1)
+    # версия пользователя (SubjectsVersion) на момент последнего изменения
+    change_seq = Column(BigInteger, nullable=False, default=0, server_default="0")
 
     subject = relationship("Subject", back_populates="activities")
\ No newline at end of file
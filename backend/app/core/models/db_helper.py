@@ -1,6 +1,11 @@
+import asyncio
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.engine import make_url
 
 from core.config import settings
+from core.metrics.db import InstrumentedAsyncPool, instrument_engine
 
 
 class DatabaseHelper:
@@ -8,9 +13,29 @@ class DatabaseHelper:
                  echo: bool = False,
                  echo_pool: bool = False,
                  max_overflow: int = 10,
-                 pool_size: int = 5
+                 pool_size: int = 5,
+                 pool_timeout: float = 30.0,
+                 pool_recycle: int = -1,
+                 pool_pre_ping: bool = False,
+                 statement_cache_size: int | None = None,
                  ):
-        self.engine = create_async_engine(url=url, echo=echo, max_overflow=max_overflow, pool_size=pool_size)
+        connect_args = {}
+        if statement_cache_size is not None and make_url(url).get_driver_name() == "asyncpg":
+            connect_args["statement_cache_size"] = statement_cache_size
+
+        self.engine = create_async_engine(
+            url=url,
+            echo=echo,
+            echo_pool=echo_pool,
+            max_overflow=max_overflow,
+            pool_size=pool_size,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+            poolclass=InstrumentedAsyncPool,
+            connect_args=connect_args,
+        )
+        instrument_engine(self.engine)
         self.session_factory = async_sessionmaker(
             bind=self.engine,
             autoflush=False,
@@ -18,6 +43,27 @@ class DatabaseHelper:
             expire_on_commit=False,
         )
 
+    async def warmup(self, connections: int) -> None:
+        """
+        Открывает connections соединений одновременно и возвращает их в пул,
+        чтобы первые запросы после старта не платили за установку соединения.
+        """
+        if connections <= 0:
+            return
+        conns = await asyncio.gather(
+            *(self.engine.connect() for _ in range(connections)),
+            return_exceptions=True,
+        )
+        try:
+            for conn in conns:
+                if isinstance(conn, BaseException):
+                    raise conn
+                await conn.execute(text("SELECT 1"))
+        finally:
+            for conn in conns:
+                if not isinstance(conn, BaseException):
+                    await conn.close()
+
     async def dispose(self):
         await self.engine.dispose()
 
@@ -25,10 +71,16 @@ class DatabaseHelper:
         async with self.session_factory() as session:
             yield session
 
+pool_size, max_overflow = settings.db.pool_limits()
+
 db_helper = DatabaseHelper(
     url=str(settings.db.url),
     echo=settings.db.echo,
     echo_pool=settings.db.echo_pool,
-    max_overflow=10,
-    pool_size=5,
-)
\ No newline at end of file
+    max_overflow=max_overflow,
+    pool_size=pool_size,
+    pool_timeout=settings.db.pool_timeout,
+    pool_recycle=settings.db.pool_recycle,
+    pool_pre_ping=settings.db.pool_pre_ping,
+    statement_cache_size=settings.db.statement_cache_size,
+)
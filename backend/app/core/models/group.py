@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String, UniqueConstraint, select
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.utils import bulk_insert, dialect_insert
+from .base import Base
+from .mixins.id_int_pk import IdIntPkMixin
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class Group(Base):
+    """
+    Учебная группа из ruz.spbstu.ru. id совпадает с id группы в RUZ,
+    synced_at - когда каталог предметов группы последний раз обновлялся оттуда.
+    """
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    name: Mapped[str] = mapped_column(String)
+    synced_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+    @classmethod
+    async def upsert(cls, session: "AsyncSession", group_id: int, name: str) -> None:
+        """Создаёт группу или обновляет её название и отметку синхронизации."""
+        insert = dialect_insert(session)
+        values = {"name": name, "synced_at": datetime.now(timezone.utc)}
+        stmt = insert(cls).values(id=group_id, **values)
+        await session.execute(
+            stmt.on_conflict_do_update(index_elements=[cls.id], set_=values)
+        )
+
+
+class GroupSubject(Base, IdIntPkMixin):
+    """
+    Предмет из общего каталога группы. Хранится один раз на группу;
+    у студентов остаются только ссылки на него (Subject.group_subject_id).
+    """
+
+    group_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("groups.id", ondelete="cascade"),
+    )
+    name: Mapped[str] = mapped_column(String)
+
+    __table_args__ = (
+        UniqueConstraint("group_id", "name"),
+    )
+
+    @classmethod
+    async def bulk_create(cls, session: "AsyncSession", group_id: int, names: list[str]) -> int:
+        """Добавляет в каталог группы новые названия, существующие пропускает."""
+        rows = [{"group_id": group_id, "name": name} for name in dict.fromkeys(names)]
+        created = await bulk_insert(session, cls, rows, conflict_columns=[cls.group_id, cls.name])
+        return len(created)
+
+    @classmethod
+    async def ids_for_group(cls, session: "AsyncSession", group_id: int) -> list[int]:
+        result = await session.scalars(select(cls.id).where(cls.group_id == group_id))
+        return list(result.all())
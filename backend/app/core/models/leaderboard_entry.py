@@ -0,0 +1,123 @@
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey, Index, Integer, String, cast, func, literal, select, update
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.utils import dialect_insert
+from .base import Base
+from .group import Group
+from .subject import Subject
+from .user import User
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class LeaderboardEntry(Base):
+    """
+    Строка рейтинга группы: суммарный прогресс пользователя по его предметам.
+    Обновляется при каждом изменении прогресса пользователя по счётчикам его предметов,
+    поэтому рейтинг читается по индексу (group_id, score) без агрегации по группе.
+    """
+
+    __tablename__ = "leaderboard_entries"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("users.id", ondelete="cascade"),
+        primary_key=True,
+    )
+    group_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("groups.id", ondelete="cascade"),
+    )
+    score: Mapped[int] = mapped_column(Integer, default=0)
+    progress_max: Mapped[int] = mapped_column(Integer, default=0)
+
+    __table_args__ = (
+        # топ группы и место пользователя: WHERE group_id = ? AND score > ?
+        Index("ix_leaderboard_entries_group_id_score", "group_id", "score"),
+    )
+
+    @classmethod
+    async def refresh(cls, session: "AsyncSession", user_id: int) -> None:
+        """
+        Пересчитывает строку пользователя из счётчиков его предметов (Subject.progress_current)
+        и переносит её в текущую группу пользователя из users.group_id - не из снимка
+        в токене, который после синхронизации может оставаться без группы.
+        Читаются только предметы самого пользователя. Вызывается при смене группы;
+        изменения прогресса сдвигают строку через add_progress.
+        """
+        def total(column):
+            return (
+                select(func.coalesce(func.sum(column), 0))
+                .where(Subject.user_id == user_id)
+                .scalar_subquery()
+            )
+
+        # строка появляется только для уже известной группы (Group создаёт синхронизация)
+        values = (
+            select(
+                literal(user_id),
+                Group.id,
+                total(Subject.progress_current),
+                total(Subject.progress_max),
+            )
+            .join(User, User.group_id == cast(Group.id, String))
+            .where(User.id == user_id)
+        )
+        insert = dialect_insert(session)
+        stmt = insert(cls).from_select(["user_id", "group_id", "score", "progress_max"], values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.user_id],
+            set_={
+                "group_id": stmt.excluded.group_id,
+                "score": stmt.excluded.score,
+                "progress_max": stmt.excluded.progress_max,
+            },
+        )
+        await session.execute(stmt)
+
+    @classmethod
+    async def add_progress(cls, session: "AsyncSession", user_id: int, score_delta: int, max_delta: int) -> None:
+        """
+        Сдвигает счёт пользователя на изменение его прогресса одним UPDATE по первичному ключу.
+        Строки нет, пока пользователь не в группе, - тогда и сдвигать нечего:
+        refresh при синхронизации посчитает её из счётчиков предметов.
+        """
+        if not score_delta and not max_delta:
+            return
+        await session.execute(
+            update(cls)
+            .where(cls.user_id == user_id)
+            .values(score=cls.score + score_delta, progress_max=cls.progress_max + max_delta)
+            .execution_options(synchronize_session=False)
+        )
+
+    @classmethod
+    async def recompute(cls, session: "AsyncSession", user_id: int | None = None) -> int:
+        """Пересчитывает счёт существующих строк (всех или одного пользователя) из счётчиков предметов."""
+        def total(column):
+            return (
+                select(func.coalesce(func.sum(column), 0))
+                .where(Subject.user_id == cls.user_id)
+                .correlate(cls)
+                .scalar_subquery()
+            )
+
+        stmt = update(cls).values(
+            score=total(Subject.progress_current),
+            progress_max=total(Subject.progress_max),
+        )
+        if user_id is not None:
+            stmt = stmt.where(cls.user_id == user_id)
+        result = await session.execute(stmt.execution_options(synchronize_session=False))
+        return result.rowcount
+
+    @classmethod
+    async def rank(cls, session: "AsyncSession", group_id: int, score: int) -> int:
+        """Место с таким счётом: 1 + число участников группы со счётом строго больше (равные делят место)."""
+        ahead = await session.scalar(
+            select(func.count()).where(cls.group_id == group_id, cls.score > score)
+        )
+        return ahead + 1
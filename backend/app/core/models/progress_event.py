@@ -0,0 +1,91 @@
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, PrimaryKeyConstraint, String, func, insert
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.utils import dialect_insert
+from .base import Base
+from .mixins.id_int_pk import IdIntPkMixin
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class ProgressEvent(Base, IdIntPkMixin):
+    """
+    Журнал изменений прогресса: строки только добавляются, кроме первичного ключа индексов нет.
+    Фоновая свёртка (services.progress_rollup) переносит события в ProgressDay и удаляет их,
+    поэтому таблица остаётся маленькой, а графики строятся только по дневным суммам.
+    """
+
+    ADD = "add"
+    PLUS = "plus"
+    MINUS = "minus"
+    DELETE = "delete"
+    DELETE_SUBJECT = "delete_subject"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("users.id", ondelete="cascade"),
+    )
+    # без внешних ключей: история остаётся и после удаления предмета или активности
+    subject_id: Mapped[int] = mapped_column(Integer)
+    activity_id: Mapped[int | None] = mapped_column(Integer)
+    kind: Mapped[str] = mapped_column(String(16))
+    # на сколько изменились сумма current_progress и сумма max_progress
+    progress_delta: Mapped[int] = mapped_column(Integer, default=0)
+    max_delta: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    @classmethod
+    async def record(cls, session: "AsyncSession", user_id: int, events: list[dict]) -> None:
+        """
+        Добавляет события одним INSERT без RETURNING в транзакции вызывающего.
+        events: словари с subject_id, activity_id, kind, progress_delta, max_delta.
+        """
+        if not events:
+            return
+        now = datetime.now(timezone.utc)
+        await session.execute(
+            insert(cls),
+            [{**event, "user_id": user_id, "created_at": now} for event in events],
+        )
+
+
+class ProgressDay(Base):
+    """
+    Дневная сумма событий прогресса по предмету пользователя.
+    Ключ начинается с (user_id, day), поэтому и график по всем предметам,
+    и график одного предмета за период читают только свой диапазон ключа.
+    """
+
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("users.id", ondelete="cascade"),
+    )
+    day: Mapped[date] = mapped_column(Date)
+    subject_id: Mapped[int] = mapped_column(Integer)
+    events: Mapped[int] = mapped_column(Integer, default=0)
+    progress_delta: Mapped[int] = mapped_column(Integer, default=0)
+    max_delta: Mapped[int] = mapped_column(Integer, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("user_id", "day", "subject_id"),
+    )
+
+    @classmethod
+    async def add_buckets(cls, session: "AsyncSession", rows: list[dict], chunk_size: int = 1000) -> None:
+        """Прибавляет суммы к дневным строкам, создавая недостающие (INSERT ... ON CONFLICT DO UPDATE)."""
+        insert_ = dialect_insert(session)
+        for start in range(0, len(rows), chunk_size):
+            stmt = insert_(cls).values(rows[start:start + chunk_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[cls.user_id, cls.day, cls.subject_id],
+                set_={
+                    "events": cls.events + stmt.excluded.events,
+                    "progress_delta": cls.progress_delta + stmt.excluded.progress_delta,
+                    "max_delta": cls.max_delta + stmt.excluded.max_delta,
+                },
+            )
+            await session.execute(stmt)
@@ -0,0 +1,18 @@
+from datetime import date, datetime
+
+from sqlalchemy import JSON, Date, DateTime, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class ScheduleWeek(Base):
+    """
+    Закэшированная неделя расписания группы из ruz.spbstu.ru.
+    Одна запись на (группа, понедельник недели) - общая для всех студентов группы.
+    """
+
+    group_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    week_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    subjects: Mapped[list[str]] = mapped_column(JSON)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
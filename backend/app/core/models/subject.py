@@ -1,15 +1,233 @@
-from sqlalchemy import Column, Integer, ForeignKey, String
-from sqlalchemy.orm import relationship
+from collections import Counter
+from typing import TYPE_CHECKING, Iterable
+
+from sqlalchemy import (
+    BigInteger, Column, Index, Integer, ForeignKey, String, UniqueConstraint, case, func, or_, select, update,
+)
+from sqlalchemy.orm import aliased, column_property, relationship
 
 from core.models import Base
+from core.utils import bulk_insert
+from .activity import Activity
+from .group import GroupSubject
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class Subject(Base):
+    """
+    Предмет в списке пользователя. Либо ссылка на предмет из каталога группы
+    (group_subject_id, name - необязательное переименование), либо собственный
+    предмет пользователя (group_subject_id пуст, name задан).
+    """
+
     __tablename__ = "subjects"
+    __table_args__ = (
+        UniqueConstraint("user_id", "name"),
+        UniqueConstraint("user_id", "group_subject_id"),
+        # список предметов пользователя: WHERE user_id = ? без обращения к таблице за id
+        Index("ix_subjects_user_id_id", "user_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    name = Column(String, nullable=False)
+    group_subject_id = Column(
+        Integer,
+        ForeignKey("group_subjects.id", ondelete="cascade"),
+        nullable=True,
+        index=True,
+    )
+    name = Column(String, nullable=True)
+    # версия пользователя (SubjectsVersion) на момент последнего изменения
+    change_seq = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+    # счётчики по активностям предмета; сдвигаются apply_counter_deltas в транзакции записи,
+    # refresh_counters пересчитывает их по активностям при восстановлении
+    activities_count = Column(Integer, nullable=False, default=0, server_default="0")
+    activities_completed = Column(Integer, nullable=False, default=0, server_default="0")
+    progress_current = Column(Integer, nullable=False, default=0, server_default="0")
+    progress_max = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # название для выдачи: своё, если задано, иначе из каталога группы
+    display_name = column_property(
+        func.coalesce(
+            name,
+            select(GroupSubject.name)
+            .where(GroupSubject.id == group_subject_id)
+            .correlate_except(GroupSubject)
+            .scalar_subquery(),
+        )
+    )
 
     user = relationship("User", back_populates="subjects")
-    activities = relationship("Activity", back_populates="subject", cascade="all, delete-orphan")
\ No newline at end of file
+    activities = relationship("Activity", back_populates="subject", cascade="all, delete-orphan")
+
+    @classmethod
+    async def bulk_create(
+        cls,
+        session: "AsyncSession",
+        user_id: int,
+        names: list[str],
+        change_seq: int = 0,
+    ) -> list["Subject"]:
+        """
+        Создаёт предметы пользователя одним INSERT, пропуская уже существующие названия.
+        Название подключённого предмета каталога (name пуст) уникальность по (user_id, name)
+        не защищает, поэтому такие названия отсеиваются отдельным запросом.
+        """
+        names = list(dict.fromkeys(names))
+        taken = set((await session.scalars(
+            select(cls.display_name).where(cls.user_id == user_id, cls.display_name.in_(names))
+        )).all())
+        rows = [
+            {"user_id": user_id, "name": name, "change_seq": change_seq}
+            for name in names
+            if name not in taken
+        ]
+        return await bulk_insert(session, cls, rows, conflict_columns=[cls.user_id, cls.name])
+
+    @classmethod
+    async def link_group_catalog(
+        cls,
+        session: "AsyncSession",
+        user_id: int,
+        group_id: int,
+        change_seq: int = 0,
+    ) -> int:
+        """
+        Подключает пользователю все предметы каталога группы.
+        Собственные предметы с тем же названием становятся ссылками на каталог
+        (активности сохраняются), если ссылки на этот предмет каталога у пользователя ещё нет;
+        для остальных создаются новые ссылки.
+        Возвращает число новых ссылок.
+        """
+        catalog_names = select(GroupSubject.name).where(GroupSubject.group_id == group_id)
+        linked = aliased(cls)
+        linked_names = (
+            select(GroupSubject.name)
+            .join(linked, linked.group_subject_id == GroupSubject.id)
+            .where(GroupSubject.group_id == group_id, linked.user_id == user_id)
+        )
+        await session.execute(
+            update(cls)
+            .where(
+                cls.user_id == user_id,
+                cls.group_subject_id.is_(None),
+                cls.name.in_(catalog_names),
+                # вторая ссылка на тот же предмет каталога нарушила бы (user_id, group_subject_id)
+                cls.name.not_in(linked_names),
+            )
+            .values(
+                group_subject_id=select(GroupSubject.id)
+                .where(GroupSubject.group_id == group_id, GroupSubject.name == cls.name)
+                .scalar_subquery(),
+                name=None,
+                change_seq=change_seq,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        rows = [
+            {"user_id": user_id, "group_subject_id": group_subject_id, "change_seq": change_seq}
+            for group_subject_id in await GroupSubject.ids_for_group(session, group_id)
+        ]
+        created = await bulk_insert(session, cls, rows, conflict_columns=[cls.user_id, cls.group_subject_id])
+        return len(created)
+
+    @staticmethod
+    def counter_delta(before: tuple[int, int] | None, after: tuple[int, int] | None) -> Counter:
+        """
+        Приращения счётчиков предмета при переходе активности из before в after.
+        before/after - (current_progress, max_progress); None - активности нет (добавление, удаление).
+        Завершённой считается активность с current_progress >= max_progress, как в _counter_values.
+        """
+        delta = Counter()
+        for sign, state in ((-1, before), (1, after)):
+            if state is None:
+                continue
+            current, maximum = (value or 0 for value in state)
+            delta["activities_count"] += sign
+            delta["activities_completed"] += sign * (current >= maximum)
+            delta["progress_current"] += sign * current
+            delta["progress_max"] += sign * maximum
+        return delta
+
+    @classmethod
+    async def apply_counter_deltas(cls, session: "AsyncSession", deltas: dict[int, Counter]) -> None:
+        """
+        Сдвигает счётчики предметов на приращения subject_id -> counter_delta(...),
+        по одному UPDATE по первичному ключу на предмет, без чтения активностей.
+        Вызывается в транзакции записи; записи одного пользователя сериализуются
+        блокировкой SubjectsVersion.bump, поэтому приращения не теряются.
+        """
+        for subject_id, delta in deltas.items():
+            values = {name: getattr(cls, name) + value for name, value in delta.items() if value}
+            if not values:
+                continue
+            await session.execute(
+                update(cls)
+                .where(cls.id == subject_id)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+
+    @classmethod
+    def _counter_values(cls) -> dict:
+        """Значения счётчиков, посчитанные по активностям предмета (коррелированные подзапросы)."""
+        current = func.coalesce(Activity.current_progress, 0)
+        maximum = func.coalesce(Activity.max_progress, 0)
+
+        def aggregate(expr):
+            return (
+                select(func.coalesce(expr, 0))
+                .where(Activity.subject_id == cls.id)
+                .correlate(cls)
+                .scalar_subquery()
+            )
+
+        return {
+            "activities_count": aggregate(func.count(Activity.id)),
+            "activities_completed": aggregate(func.sum(case((current >= maximum, 1), else_=0))),
+            "progress_current": aggregate(func.sum(current)),
+            "progress_max": aggregate(func.sum(maximum)),
+        }
+
+    @classmethod
+    async def refresh_counters(
+        cls,
+        session: "AsyncSession",
+        subject_ids: Iterable[int] | None = None,
+        only_drifted: bool = False,
+    ) -> int:
+        """
+        Пересчитывает счётчики предметов по активностям одним UPDATE по индексу
+        (subject_id, id) активностей - путь восстановления (actions/recompute_subject_counters.py);
+        обычные записи сдвигают счётчики через apply_counter_deltas.
+        subject_ids=None - все предметы; only_drifted - обновлять только разошедшиеся строки.
+        Возвращает число обновлённых строк.
+        """
+        values = cls._counter_values()
+        stmt = update(cls).values(**values).execution_options(synchronize_session=False)
+        if subject_ids is not None:
+            subject_ids = list(subject_ids)
+            if not subject_ids:
+                return 0
+            stmt = stmt.where(cls.id.in_(subject_ids))
+        if only_drifted:
+            stmt = stmt.where(cls._drifted(values))
+        result = await session.execute(stmt)
+        return result.rowcount
+
+    @classmethod
+    def _drifted(cls, values: dict):
+        return or_(*(getattr(cls, name).is_distinct_from(value) for name, value in values.items()))
+
+    @classmethod
+    async def find_drifted(cls, session: "AsyncSession", subject_ids: Iterable[int]) -> list[tuple[int, int]]:
+        """(id, user_id) предметов из subject_ids, чьи счётчики разошлись с активностями."""
+        stmt = select(cls.id, cls.user_id).where(
+            cls.id.in_(list(subject_ids)),
+            cls._drifted(cls._counter_values()),
+        )
+        return [tuple(row) for row in (await session.execute(stmt)).all()]
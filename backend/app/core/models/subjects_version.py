@@ -0,0 +1,45 @@
+from typing import TYPE_CHECKING
+
+from sqlalchemy import BigInteger, ForeignKey, Integer, select
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.utils import dialect_insert
+from .base import Base
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class SubjectsVersion(Base):
+    """
+    Версия данных пользователя: растёт при любом изменении его предметов и активностей.
+    По ней строится ETag, поэтому проверка "ничего не изменилось" - один запрос по ключу,
+    а изменённые строки помечаются ею в change_seq для /subjects/changes.
+    """
+
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("users.id", ondelete="cascade"),
+        primary_key=True,
+    )
+    version: Mapped[int] = mapped_column(BigInteger, default=0)
+
+    @classmethod
+    async def bump(cls, session: "AsyncSession", user_id: int) -> int:
+        """
+        Увеличивает версию в транзакции вызывающего и возвращает новую; коммит остаётся за ним.
+        Строка версии блокируется до конца транзакции, поэтому версии пользователя
+        выдаются в порядке коммитов и годятся как курсор изменений (change_seq).
+        """
+        insert = dialect_insert(session)
+        stmt = insert(cls).values(user_id=user_id, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.user_id],
+            set_={"version": cls.version + 1},
+        )
+        return await session.scalar(stmt.returning(cls.version))
+
+    @classmethod
+    async def current(cls, session: "AsyncSession", user_id: int) -> int:
+        version = await session.scalar(select(cls.version).where(cls.user_id == user_id))
+        return version or 0
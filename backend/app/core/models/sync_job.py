@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+from .mixins.id_int_pk import IdIntPkMixin
+
+
+class SyncJob(Base, IdIntPkMixin):
+    """
+    Задача синхронизации пользователя с расписанием университета.
+    Пока задача в работе, next_run_at служит арендой: если воркер упал,
+    задача снова станет доступна после её истечения.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("users.id", ondelete="cascade"),
+        index=True,
+    )
+    status: Mapped[str] = mapped_column(String(16), default=PENDING)
+    # resolve_group -> import_subjects
+    stage: Mapped[str | None] = mapped_column(String(32))
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=5)
+    next_run_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+    )
+    last_error: Mapped[str | None] = mapped_column(String)
+    subjects_imported: Mapped[int | None] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (
+        Index("ix_sync_jobs_status_next_run_at", "status", "next_run_at"),
+    )
@@ -0,0 +1,48 @@
+from typing import TYPE_CHECKING
+
+from sqlalchemy import BigInteger, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.utils import bulk_insert
+from .base import Base
+from .mixins.id_int_pk import IdIntPkMixin
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class Tombstone(Base, IdIntPkMixin):
+    """
+    След удалённого предмета или активности для /subjects/changes.
+    Активности удалённого предмета отдельных следов не получают - клиент удаляет их вместе с предметом.
+    """
+
+    SUBJECT = "subject"
+    ACTIVITY = "activity"
+
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("users.id", ondelete="cascade"),
+    )
+    kind: Mapped[str] = mapped_column(String(16))
+    object_id: Mapped[int] = mapped_column(Integer)
+    change_seq: Mapped[int] = mapped_column(BigInteger)
+
+    __table_args__ = (
+        Index("ix_tombstones_user_id_change_seq", "user_id", "change_seq"),
+    )
+
+    @classmethod
+    async def record(
+        cls,
+        session: "AsyncSession",
+        user_id: int,
+        kind: str,
+        object_ids: list[int],
+        change_seq: int,
+    ) -> None:
+        rows = [
+            {"user_id": user_id, "kind": kind, "object_id": object_id, "change_seq": change_seq}
+            for object_id in object_ids
+        ]
+        await bulk_insert(session, cls, rows)
@@ -0,0 +1,69 @@
+from typing import Annotated, List, Literal, Optional, Union
+
+from pydantic import BaseModel, Field, model_validator
+
+from core.schemas.activity import ActivityRead
+from core.schemas.subject import SubjectRead
+
+
+class CreateSubjectOp(BaseModel):
+    op: Literal["create_subject"]
+    name: str
+
+
+class AddActivityOp(BaseModel):
+    op: Literal["add_activity"]
+    # Либо id существующего предмета, либо индекс операции create_subject в этом же пакете
+    subject_id: Optional[int] = None
+    subject_ref: Optional[int] = None
+    name: str
+    max_progress: int
+
+    @model_validator(mode="after")
+    def check_subject(self):
+        if (self.subject_id is None) == (self.subject_ref is None):
+            raise ValueError("Нужно указать ровно одно из полей subject_id или subject_ref")
+        return self
+
+
+class ProgressOp(BaseModel):
+    op: Literal["progress"]
+    # Либо id существующей активности, либо индекс операции add_activity в этом же пакете
+    activity_id: Optional[int] = None
+    activity_ref: Optional[int] = None
+    delta: int
+
+    @model_validator(mode="after")
+    def check_activity(self):
+        if (self.activity_id is None) == (self.activity_ref is None):
+            raise ValueError("Нужно указать ровно одно из полей activity_id или activity_ref")
+        return self
+
+
+class DeleteSubjectOp(BaseModel):
+    op: Literal["delete_subject"]
+    subject_id: int
+
+
+class DeleteActivityOp(BaseModel):
+    op: Literal["delete_activity"]
+    activity_id: int
+
+
+BatchOperation = Annotated[
+    Union[CreateSubjectOp, AddActivityOp, ProgressOp, DeleteSubjectOp, DeleteActivityOp],
+    Field(discriminator="op"),
+]
+
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(min_length=1, max_length=200)
+
+
+class BatchResult(BaseModel):
+    index: int
+    op: str
+    status_code: int
+    detail: Optional[str] = None
+    subject: Optional[SubjectRead] = None
+    activity: Optional[ActivityRead] = None
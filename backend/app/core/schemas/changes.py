@@ -0,0 +1,20 @@
+from typing import List
+
+from pydantic import BaseModel
+
+from core.schemas.activity import ActivityRead
+from core.schemas.subject import SubjectBase
+
+
+class SubjectChange(SubjectBase):
+    id: int
+
+class ChangesRead(BaseModel):
+    # передаётся как since в следующий запрос
+    cursor: int
+    # true - это полный снимок, а не изменения
+    reset: bool
+    subjects: List[SubjectChange] = []
+    activities: List[ActivityRead] = []
+    deleted_subjects: List[int] = []
+    deleted_activities: List[int] = []
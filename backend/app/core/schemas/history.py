@@ -0,0 +1,19 @@
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class ProgressDayRead(BaseModel):
+    day: date
+    events: int
+    progress_delta: int
+    max_delta: int
+    # накопленные значения на конец дня
+    current_progress: int
+    max_progress: int
+
+class ProgressHistoryRead(BaseModel):
+    # None - по всем предметам пользователя
+    subject_id: Optional[int] = None
+    days: List[ProgressDayRead]
@@ -0,0 +1,17 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class LeaderboardEntryRead(BaseModel):
+    # равный счёт - одно место на всех
+    rank: int
+    user_id: int
+    score: int
+    max_progress: int
+
+class LeaderboardRead(BaseModel):
+    group_id: int
+    top: List[LeaderboardEntryRead]
+    # место текущего пользователя, даже если он не попал в top
+    me: LeaderboardEntryRead
@@ -0,0 +1,20 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class ProgressTotals(BaseModel):
+    activities_count: int
+    current_progress: int
+    max_progress: int
+    remaining: int
+    # current_progress / max_progress; 0, если сдавать нечего
+    completion: float
+
+class SubjectProgressStats(ProgressTotals):
+    id: int
+    name: str
+
+class ProgressStatsRead(BaseModel):
+    subjects: List[SubjectProgressStats]
+    total: ProgressTotals
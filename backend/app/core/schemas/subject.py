@@ -15,4 +15,12 @@ class SubjectRead(SubjectBase):
     id: int
     activities: List[ActivityRead] = []
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class SubjectNameRead(SubjectBase):
+    id: int
+
+class SubjectSummaryRead(SubjectBase):
+    id: int
+    activities_count: int
+    activities_completed: int
@@ -1,5 +1,23 @@
-from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
 
 
 class SyncGroupRequest(BaseModel):
-    group_name: str
\ No newline at end of file
+    group_name: str
+
+
+class SyncJobRead(BaseModel):
+    id: int
+    status: str
+    stage: Optional[str]
+    attempts: int
+    max_attempts: int
+    next_run_at: datetime
+    last_error: Optional[str]
+    subjects_imported: Optional[int]
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,5 +1,11 @@
 __all__ = (
     "camel_case_to_snake_case",
+    "dialect_insert",
+    "bulk_insert",
+    "subject_payloads",
+    "subject_summary_payloads",
 )
 
-from .case_converter import camel_case_to_snake_case
\ No newline at end of file
+from .case_converter import camel_case_to_snake_case
+from .sql import dialect_insert, bulk_insert
+from .serialization import subject_payloads, subject_summary_payloads
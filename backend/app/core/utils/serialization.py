@@ -0,0 +1,42 @@
+from typing import Iterable, Sequence
+
+
+def subject_payloads(
+    subject_rows: Iterable[Sequence],
+    activity_rows: Iterable[Sequence],
+) -> list[dict]:
+    """
+    Предметы с активностями в виде SubjectRead, собранные прямо из строк запроса.
+    subject_rows: (id, name); activity_rows: (id, subject_id, name, current_progress, max_progress).
+    Порядок полей совпадает с SubjectRead/ActivityRead, поэтому JSON не отличается от обычного ответа.
+    """
+    activities: dict[int, list[dict]] = {}
+    for a_id, subject_id, name, current_progress, max_progress in activity_rows:
+        activities.setdefault(subject_id, []).append({
+            "name": name,
+            "max_progress": max_progress,
+            "id": a_id,
+            "current_progress": current_progress,
+            "subject_id": subject_id,
+        })
+
+    return [
+        {"name": name, "id": s_id, "activities": activities.get(s_id, [])}
+        for s_id, name in subject_rows
+    ]
+
+
+def subject_summary_payloads(subject_rows: Iterable[Sequence]) -> list[dict]:
+    """
+    Предметы со счётчиками вместо списка активностей.
+    subject_rows: (id, name, activities_count, activities_completed).
+    """
+    return [
+        {
+            "name": name,
+            "id": s_id,
+            "activities_count": total,
+            "activities_completed": completed,
+        }
+        for s_id, name, total, completed in subject_rows
+    ]
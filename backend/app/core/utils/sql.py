@@ -0,0 +1,35 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def dialect_insert(session: AsyncSession):
+    """
+    insert() нужного диалекта, чтобы пользоваться on_conflict_do_nothing/do_update.
+    Postgres в проде, sqlite в тестах - API у них одинаковый.
+    """
+    if session.get_bind().dialect.name == "sqlite":
+        return sqlite.insert
+    return postgresql.insert
+
+
+async def bulk_insert(
+    session: AsyncSession,
+    model,
+    rows: list[dict],
+    conflict_columns: list | None = None,
+    chunk_size: int = 1000,
+) -> list:
+    """
+    Многострочный INSERT ... RETURNING одним запросом на chunk_size строк.
+    При conflict_columns строки, нарушающие уникальность по ним, пропускаются
+    (ON CONFLICT DO NOTHING) и не попадают в результат. Коммит остаётся за вызывающим.
+    """
+    insert = dialect_insert(session)
+    created = []
+    for start in range(0, len(rows), chunk_size):
+        stmt = insert(model).values(rows[start:start + chunk_size])
+        if conflict_columns is not None:
+            stmt = stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+        result = await session.scalars(stmt.returning(model))
+        created.extend(result.all())
+    return created
@@ -2,16 +2,31 @@ from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from api import router as api_router
 from core.config import settings
+from core.metrics import MetricsMiddleware, exporter as metrics_exporter
 from core.models import db_helper, Base
+from services.progress_rollup import progress_rollup
+from services.sync_worker import sync_worker
+from services.unversity import uni_service
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # startup
+    pool_size, _ = settings.db.pool_limits()
+    await db_helper.warmup(min(settings.db.pool_warmup, pool_size))
+    await uni_service.start()
+    sync_worker.start()
+    progress_rollup.start()
+    metrics_exporter.start()
     yield
     # shutdown
+    await sync_worker.stop()
+    await progress_rollup.stop()
+    await metrics_exporter.stop()
+    await uni_service.close()
     await db_helper.dispose()
 
 main_app = FastAPI(
@@ -23,11 +38,16 @@ main_app = FastAPI(
     root_path=settings.api.prefix
 )
 main_app.include_router(api_router)
+main_app.add_middleware(MetricsMiddleware)
 
 @main_app.get('/')
 def root():
     return {"message": "приветик", "version": settings.api.v1.prefix}
 
+@main_app.get('/metrics', include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(await metrics_exporter.render_async(), media_type="text/plain; version=0.0.4")
+
 if __name__ == '__main__':
     uvicorn.run("main:main_app",
                 host=settings.run.host,
@@ -0,0 +1,39 @@
+from core.config import settings
+from core.gunicorn import Application, get_app_options
+
+workers = settings.gunicorn.worker_count()
+# пул соединений каждого воркера считается от их числа (db.max_connections / workers),
+# поэтому значение задаётся до импорта приложения и создания движка
+settings.db.workers = workers
+
+from core.metrics import MetricsExporter
+from main import main_app
+
+
+def on_starting(server) -> None:
+    # снимки метрик прошлого запуска не должны попасть в суммы нового
+    if settings.metrics.multiproc_dir:
+        MetricsExporter.clear(settings.metrics.multiproc_dir)
+
+
+def main():
+    Application(
+        application=main_app,
+        options=get_app_options(
+            host=settings.gunicorn.host,
+            port=settings.gunicorn.port,
+            timeout=settings.gunicorn.timeout,
+            workers=workers,
+            log_level=settings.logging.log_level,
+            graceful_timeout=settings.gunicorn.graceful_timeout,
+            keepalive=settings.gunicorn.keepalive,
+            max_requests=settings.gunicorn.max_requests,
+            max_requests_jitter=settings.gunicorn.max_requests_jitter,
+            preload_app=settings.gunicorn.preload,
+            on_starting=on_starting,
+        ),
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import time
+from collections import deque
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    closed -> open после failure_threshold ошибок подряд;
+    open -> half_open через reset_timeout секунд, пропускается не больше
+    half_open_max_calls пробных запросов; успех пробы закрывает цепь, ошибка - снова открывает.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        half_open_max_calls: int = 1,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.rejected = 0
+
+    def before_call(self) -> None:
+        """Бросает CircuitOpenError, если запрос наружу сейчас делать нельзя."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError("University API circuit is open")
+            self.state = self.HALF_OPEN
+            self.half_open_calls = 0
+
+        if self.state == self.HALF_OPEN:
+            if self.half_open_calls >= self.half_open_max_calls:
+                self.rejected += 1
+                raise CircuitOpenError("University API circuit is half-open, probe in progress")
+            self.half_open_calls += 1
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.half_open_calls = 0
+
+    def release(self) -> None:
+        """Возвращает пробный слот half_open, если вызов завершился без исхода (не успех и не сбой)."""
+        if self.state == self.HALF_OPEN and self.half_open_calls > 0:
+            self.half_open_calls -= 1
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self.half_open_calls = 0
+
+    def snapshot(self) -> dict:
+        retry_in = 0.0
+        if self.state == self.OPEN:
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in_seconds": round(retry_in, 3),
+            "rejected_total": self.rejected,
+        }
+
+
+class AdaptiveTimeout:
+    """
+    Таймаут запроса по наблюдаемой задержке: p95 последних window ответов * factor,
+    в пределах [min_timeout, max_timeout]. Пока замеров мало - max_timeout.
+    Запрос, упёршийся в таймаут, учитывается замером, равным этому таймауту,
+    иначе при замедлении upstream окно видело бы только быстрые ответы и лимит не рос бы.
+    """
+
+    def __init__(
+        self,
+        min_timeout: float,
+        max_timeout: float,
+        factor: float,
+        window: int = 100,
+        min_samples: int = 10,
+    ):
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.factor = factor
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def observe_timeout(self, limit: float) -> None:
+        self._samples.append(limit)
+
+    def percentile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def timeout(self) -> float:
+        if len(self._samples) < self.min_samples:
+            return self.max_timeout
+        p95 = self.percentile(0.95)
+        return min(self.max_timeout, max(self.min_timeout, p95 * self.factor))
+
+    def snapshot(self) -> dict:
+        return {
+            "timeout_seconds": round(self.timeout(), 3),
+            "latency_p50": self.percentile(0.5),
+            "latency_p95": self.percentile(0.95),
+            "samples": len(self._samples),
+        }
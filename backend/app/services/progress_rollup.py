@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.config import settings
+from core.models import db_helper, ProgressDay, ProgressEvent
+
+log = logging.getLogger(__name__)
+
+
+def local_day(moment: datetime) -> date:
+    """День события по часовому поясу графиков (settings.progress_rollup.utc_offset_hours)."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    offset = timezone(timedelta(hours=settings.progress_rollup.utc_offset_hours))
+    return moment.astimezone(offset).date()
+
+
+class ProgressRollup:
+    """
+    Периодически сворачивает ProgressEvent в дневные суммы ProgressDay и удаляет свёрнутые события.
+    События забираются через SELECT ... FOR UPDATE SKIP LOCKED, поэтому воркеры gunicorn
+    делят журнал между собой, и каждое событие попадает в сумму ровно один раз.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+        self.config = settings.progress_rollup
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self.config.enabled and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                log.exception("Progress rollup iteration failed")
+            await asyncio.sleep(self.config.interval_seconds)
+
+    async def run_once(self) -> int:
+        """Сворачивает весь накопившийся журнал пачками. Возвращает число событий."""
+        total = 0
+        while True:
+            processed = await self._compact_batch()
+            total += processed
+            if processed < self.config.batch_size:
+                return total
+
+    async def _compact_batch(self) -> int:
+        async with self.session_factory() as session:
+            stmt = (
+                select(
+                    ProgressEvent.id,
+                    ProgressEvent.user_id,
+                    ProgressEvent.subject_id,
+                    ProgressEvent.progress_delta,
+                    ProgressEvent.max_delta,
+                    ProgressEvent.created_at,
+                )
+                .order_by(ProgressEvent.id)
+                .limit(self.config.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            events = (await session.execute(stmt)).all()
+            if not events:
+                return 0
+
+            buckets: dict[tuple[int, date, int], dict] = {}
+            for _, user_id, subject_id, progress_delta, max_delta, created_at in events:
+                key = (user_id, local_day(created_at), subject_id)
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = {
+                        "user_id": user_id,
+                        "day": key[1],
+                        "subject_id": subject_id,
+                        "events": 0,
+                        "progress_delta": 0,
+                        "max_delta": 0,
+                    }
+                bucket["events"] += 1
+                bucket["progress_delta"] += progress_delta
+                bucket["max_delta"] += max_delta
+
+            await ProgressDay.add_buckets(session, list(buckets.values()))
+            await session.execute(
+                delete(ProgressEvent).where(ProgressEvent.id.in_([event.id for event in events]))
+            )
+            await session.commit()
+        return len(events)
+
+
+progress_rollup = ProgressRollup(session_factory=db_helper.session_factory)
@@ -0,0 +1,69 @@
+import logging
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.models import ScheduleWeek
+from core.utils import dialect_insert
+
+log = logging.getLogger(__name__)
+
+
+class ScheduleCache:
+    """
+    Хранилище недель расписания в таблице schedule_weeks.
+    Ошибки БД не должны ломать импорт предметов, поэтому они только логируются.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+
+    @staticmethod
+    def week_start(day: date) -> date:
+        return day - timedelta(days=day.weekday())
+
+    async def get(self, group_id: int, week_start: date) -> tuple[set[str], float] | None:
+        """Возвращает (предметы, возраст записи в секундах) или None."""
+        try:
+            async with self.session_factory() as session:
+                entry = (await session.execute(
+                    select(ScheduleWeek).where(
+                        ScheduleWeek.group_id == group_id,
+                        ScheduleWeek.week_start == week_start,
+                    )
+                )).scalar_one_or_none()
+        except Exception:
+            log.exception("Schedule cache read failed")
+            return None
+
+        if entry is None:
+            return None
+        fetched_at = entry.fetched_at
+        if fetched_at.tzinfo is None:
+            fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+        age = (datetime.now(timezone.utc) - fetched_at).total_seconds()
+        return set(entry.subjects), age
+
+    async def put(self, group_id: int, week_start: date, subjects: set[str]) -> None:
+        values = {
+            "group_id": group_id,
+            "week_start": week_start,
+            "subjects": sorted(subjects),
+            "fetched_at": datetime.now(timezone.utc),
+        }
+        try:
+            async with self.session_factory() as session:
+                insert = dialect_insert(session)
+                stmt = insert(ScheduleWeek).values(**values)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[ScheduleWeek.group_id, ScheduleWeek.week_start],
+                    set_={
+                        "subjects": stmt.excluded.subjects,
+                        "fetched_at": stmt.excluded.fetched_at,
+                    },
+                )
+                await session.execute(stmt)
+                await session.commit()
+        except Exception:
+            log.exception("Schedule cache write failed")
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.authentication.token_cache import token_cache
+from core.config import settings
+from core.models import db_helper, Group, GroupSubject, LeaderboardEntry, Subject, SubjectsVersion, SyncJob, User
+from services.unversity import uni_service
+
+log = logging.getLogger(__name__)
+
+
+class SyncWorker:
+    """
+    Фоновый обработчик задач SyncJob: определяет группу пользователя,
+    при необходимости обновляет каталог предметов группы из расписания университета
+    и подключает пользователю предметы каталога.
+
+    Задачи забираются через SELECT ... FOR UPDATE SKIP LOCKED, поэтому
+    несколько воркеров gunicorn могут работать с одной таблицей одновременно.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+        self.config = settings.sync
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def enqueue(self, session: AsyncSession, user_id: int) -> SyncJob:
+        """Добавляет задачу в сессию вызывающего; коммит остаётся за ним."""
+        job = SyncJob(
+            user_id=user_id,
+            status=SyncJob.PENDING,
+            max_attempts=self.config.max_attempts,
+            next_run_at=datetime.now(timezone.utc),
+        )
+        session.add(job)
+        return job
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def start(self) -> None:
+        if self.config.enabled and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                processed = await self.run_pending()
+            except Exception:
+                log.exception("Sync worker iteration failed")
+                processed = 0
+            if processed:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.config.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def run_pending(self) -> int:
+        """Забирает и выполняет готовые задачи. Возвращает их количество."""
+        job_ids = await self._claim()
+        await asyncio.gather(*(self._process(job_id) for job_id in job_ids))
+        return len(job_ids)
+
+    async def _claim(self) -> list[int]:
+        now = datetime.now(timezone.utc)
+        async with self.session_factory() as session:
+            stmt = (
+                select(SyncJob.id)
+                .where(
+                    or_(SyncJob.status == SyncJob.PENDING, SyncJob.status == SyncJob.RUNNING),
+                    SyncJob.next_run_at <= now,
+                )
+                .order_by(SyncJob.next_run_at)
+                .limit(self.config.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            job_ids = list((await session.execute(stmt)).scalars().all())
+            if job_ids:
+                await session.execute(
+                    update(SyncJob)
+                    .where(SyncJob.id.in_(job_ids))
+                    .values(
+                        status=SyncJob.RUNNING,
+                        attempts=SyncJob.attempts + 1,
+                        next_run_at=now + timedelta(seconds=self.config.lease_seconds),
+                    )
+                )
+            await session.commit()
+        return job_ids
+
+    async def _process(self, job_id: int) -> None:
+        async with self.session_factory() as session:
+            job = await session.get(SyncJob, job_id)
+            user = await session.get(User, job.user_id) if job else None
+            if user is None:
+                return
+            user_id, group_name = user.id, user.group_name
+
+        # запросы к университету идут без открытой транзакции и без занятого соединения
+        stage = "resolve_group"
+        try:
+            await self._set_stage(job_id, stage)
+            ext_group_id = await uni_service.get_group_id_by_number(group_name)
+            stage = "import_subjects"
+            await self._set_stage(job_id, stage)
+            # каталог группы обновляется из RUZ не чаще раза в schedule_ttl_seconds,
+            # остальные студенты группы получают готовый список без запросов наружу
+            subjects_names = None
+            if not await self._catalog_is_fresh(ext_group_id):
+                subjects_names = await uni_service.get_subjects_list(ext_group_id)
+
+            async with self.session_factory() as session:
+                await session.execute(
+                    update(User).where(User.id == user_id).values(group_id=str(ext_group_id))
+                )
+                if subjects_names is not None:
+                    await Group.upsert(session, ext_group_id, group_name)
+                    await GroupSubject.bulk_create(session, ext_group_id, subjects_names)
+                version = await SubjectsVersion.bump(session, user_id)
+                imported = await Subject.link_group_catalog(session, user_id, ext_group_id, version)
+                # при смене группы строка рейтинга переезжает в новую
+                await LeaderboardEntry.refresh(session, user_id)
+                await session.execute(
+                    update(SyncJob)
+                    .where(SyncJob.id == job_id)
+                    .values(
+                        status=SyncJob.DONE,
+                        stage=stage,
+                        subjects_imported=imported,
+                        last_error=None,
+                    )
+                )
+                await session.commit()
+        except Exception as e:
+            await self._fail(job_id, stage, e)
+            return
+
+        await token_cache.invalidate_user(user_id)
+
+    async def _set_stage(self, job_id: int, stage: str) -> None:
+        """Сохраняет текущий этап задачи отдельной короткой транзакцией, чтобы его видел /sync/status."""
+        async with self.session_factory() as session:
+            await session.execute(update(SyncJob).where(SyncJob.id == job_id).values(stage=stage))
+            await session.commit()
+
+    async def _catalog_is_fresh(self, group_id: int) -> bool:
+        async with self.session_factory() as session:
+            synced_at = await session.scalar(select(Group.synced_at).where(Group.id == group_id))
+        if synced_at is None:
+            return False
+        if synced_at.tzinfo is None:
+            synced_at = synced_at.replace(tzinfo=timezone.utc)
+        age = datetime.now(timezone.utc) - synced_at
+        return age < timedelta(seconds=settings.university.schedule_ttl_seconds)
+
+    async def _fail(self, job_id: int, stage: str, error: Exception) -> None:
+        async with self.session_factory() as session:
+            job = await session.get(SyncJob, job_id)
+            job.stage = stage
+            self._schedule_retry(job, error)
+            await session.commit()
+
+    def _schedule_retry(self, job: SyncJob, error: Exception) -> None:
+        # 4xx от сервиса (например, группа не найдена) повторять бессмысленно
+        permanent = isinstance(error, HTTPException) and error.status_code < 500
+        job.last_error = error.detail if isinstance(error, HTTPException) else repr(error)
+
+        if permanent or job.attempts >= job.max_attempts:
+            job.status = SyncJob.FAILED
+            log.warning("Sync job %s failed: %s", job.id, job.last_error)
+        else:
+            delay = min(
+                self.config.backoff_base_seconds * 2 ** (job.attempts - 1),
+                self.config.backoff_max_seconds,
+            )
+            delay *= random.uniform(0.9, 1.1)
+            job.status = SyncJob.PENDING
+            job.next_run_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+
+sync_worker = SyncWorker(session_factory=db_helper.session_factory)
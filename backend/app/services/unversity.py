@@ -1,29 +1,220 @@
-from datetime import datetime, timedelta
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from importlib.util import find_spec
+from typing import Awaitable, Callable, Hashable, TypeVar
 
 import httpx
 from fastapi import HTTPException, status
 
+from core.config import UniversityApiConfig, settings
+from core.metrics import registry as metrics_registry
+from core.models import db_helper
+from services.circuit_breaker import AdaptiveTimeout, CircuitBreaker, CircuitOpenError
+from services.schedule_cache import ScheduleCache
+
+T = TypeVar("T")
+
+log = logging.getLogger(__name__)
+
+upstream_requests = metrics_registry.counter(
+    "university_requests",
+    "Запросы к ruz.spbstu.ru по исходу: ok, client_error, server_error, network_error, circuit_open",
+    labelnames=("endpoint", "outcome"),
+)
+upstream_seconds = metrics_registry.histogram(
+    "university_request_seconds",
+    "Задержка ответа ruz.spbstu.ru",
+    labelnames=("endpoint",),
+)
+schedule_cache_lookups = metrics_registry.counter(
+    "university_schedule_cache",
+    "Обращения к кэшу недель расписания: fresh, stale, miss, fallback",
+    labelnames=("result",),
+)
+coalesced_calls = metrics_registry.counter(
+    "university_coalesced_calls",
+    "Вызовы, присоединившиеся к уже идущему запросу",
+    labelnames=("kind",),
+)
+
+
+class SingleFlight:
+    """
+    Объединяет одинаковые параллельные вызовы: пока вызов с ключом key выполняется,
+    остальные вызывающие ждут тот же результат (или ту же ошибку), а не идут наружу сами.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        self.calls: Counter[str] = Counter()
+        self.coalesced: Counter[str] = Counter()
+
+    async def do(self, kind: str, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls[kind] += 1
+        full_key = (kind, key)
+        task = self._in_flight.get(full_key)
+        if task is not None:
+            self.coalesced[kind] += 1
+            coalesced_calls.inc(kind=kind)
+        else:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[full_key] = task
+            task.add_done_callback(lambda t: self._done(full_key, t))
+        # отмена одного ожидающего не должна отменять общий вызов
+        return await asyncio.shield(task)
+
+    def _done(self, full_key: tuple[str, Hashable], task: asyncio.Task) -> None:
+        self._in_flight.pop(full_key, None)
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {
+            kind: {"calls": self.calls[kind], "coalesced": self.coalesced[kind]}
+            for kind in self.calls
+        }
+
+
 class UniversityService:
-    BASE_URL = "https://ruz.spbstu.ru/api/v1/ruz"
+    def __init__(
+        self,
+        config: UniversityApiConfig,
+        transport: httpx.AsyncBaseTransport | None = None,
+        schedule_cache: ScheduleCache | None = None,
+    ):
+        self.config = config
+        self.base_url = config.base_url
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self.schedule_cache = schedule_cache
+        self._refreshing: dict[tuple[int, date], asyncio.Task] = {}
+        self.single_flight = SingleFlight()
+        self.breaker = CircuitBreaker(
+            failure_threshold=config.breaker_failure_threshold,
+            reset_timeout=config.breaker_reset_timeout_seconds,
+            half_open_max_calls=config.breaker_half_open_max_calls,
+        )
+        self.latency = AdaptiveTimeout(
+            min_timeout=config.adaptive_timeout_min,
+            max_timeout=config.read_timeout,
+            factor=config.adaptive_timeout_factor,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Общий клиент с пулом keep-alive соединений к ruz.spbstu.ru.
+        Создаётся в lifespan приложения; вне его (скрипты, тесты) - лениво при первом запросе.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                transport=self._transport,
+                http2=self.config.http2 and find_spec("h2") is not None,
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_keepalive_connections,
+                    keepalive_expiry=self.config.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(
+                    self.config.read_timeout,
+                    connect=self.config.connect_timeout,
+                    pool=self.config.pool_timeout,
+                ),
+            )
+        return self._client
+
+    async def start(self) -> None:
+        _ = self.client
+
+    async def close(self) -> None:
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _get(self, endpoint: str, url: str, params: dict) -> httpx.Response:
+        """
+        GET к университету через circuit breaker и с адаптивным таймаутом.
+        Ошибками считаются только сетевые сбои, таймауты и 5xx; 4xx - это ответ, а не сбой.
+        """
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            upstream_requests.inc(endpoint=endpoint, outcome="circuit_open")
+            raise
+        timeout = httpx.Timeout(
+            self.latency.timeout(),
+            connect=self.config.connect_timeout,
+            pool=self.config.pool_timeout,
+        )
+        started = time.monotonic()
+        settled = False
+        try:
+            response = await self.client.get(url, params=params, timeout=timeout)
+            settled = True
+        except httpx.TimeoutException:
+            settled = True
+            self.breaker.record_failure()
+            self.latency.observe_timeout(timeout.read)
+            upstream_requests.inc(endpoint=endpoint, outcome="network_error")
+            raise
+        except (httpx.HTTPError, asyncio.CancelledError):
+            settled = True
+            self.breaker.record_failure()
+            upstream_requests.inc(endpoint=endpoint, outcome="network_error")
+            raise
+        finally:
+            if not settled:
+                # исключение не от httpx - не исход пробы; без этого слот half_open
+                # остался бы занят и цепь не закрылась бы никогда
+                self.breaker.release()
+
+        elapsed = time.monotonic() - started
+        upstream_seconds.observe(elapsed, endpoint=endpoint)
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+            upstream_requests.inc(endpoint=endpoint, outcome="server_error")
+        else:
+            self.breaker.record_success()
+            self.latency.observe(elapsed)
+            outcome = "client_error" if response.status_code >= 400 else "ok"
+            upstream_requests.inc(endpoint=endpoint, outcome=outcome)
+        response.raise_for_status()
+        return response
+
+    def health(self) -> dict:
+        return {
+            "circuit": self.breaker.snapshot(),
+            "latency": self.latency.snapshot(),
+            "single_flight": self.single_flight.stats(),
+        }
 
     async def get_group_id_by_number(self, group_name: str) -> int:
         """
         Получает ID группы по её названию (например, '5130904/30105').
+        Одновременные запросы одной и той же группы выполняются одним вызовом.
         """
-        url = f"{self.BASE_URL}/search/groups"
+        return await self.single_flight.do(
+            "group", group_name, lambda: self._get_group_id_by_number(group_name)
+        )
+
+    async def _get_group_id_by_number(self, group_name: str) -> int:
+        url = f"{self.base_url}/search/groups"
         params = {"q": group_name}
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, params=params, timeout=10.0)
-                response.raise_for_status()
-            except httpx.HTTPError as e:
-                # Если API университета недоступно
-                print(f"University API Error: {e}")
-                raise HTTPException(
-                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    detail="Сервис расписания университета временно недоступен"
-                )
+        try:
+            response = await self._get("search_groups", url, params)
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            # Если API университета недоступно
+            log.warning("University API error: %r", e)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Сервис расписания университета временно недоступен"
+            )
 
         data = response.json()
         groups = data.get("groups", [])
@@ -49,41 +240,151 @@ class UniversityService:
         else:
             return f"{now.year}-04-10"
 
-    async def get_subjects_list(self, group_id: int) -> list[str]:
+    def _get_semester_bounds(self) -> tuple[date, date]:
+        """Первый и последний учебный день текущего семестра."""
+        now = datetime.now()
+        if now.month >= 9 or now.month == 1:
+            year = now.year if now.month >= 9 else now.year - 1
+            return date(year, 9, 1), date(year, 12, 28)
+        return date(now.year, 2, 9), date(now.year, 5, 31)
+
+    def _get_dates_to_check(self, weeks: int) -> list[str]:
         """
-        Получает уникальный список предметов за 2 недели в середине семестра.
+        weeks <= 2 - две недели в середине семестра (быстрый режим),
+        иначе - weeks дат, равномерно разнесённых по всему семестру.
         """
-        target_date_str = self._get_mid_semester_date()
-        target_date = datetime.strptime(target_date_str, "%Y-%m-%d")
+        if weeks <= 2:
+            target_date_str = self._get_mid_semester_date()
+            target_date = datetime.strptime(target_date_str, "%Y-%m-%d")
+            return [
+                target_date_str,
+                (target_date + timedelta(days=7)).strftime("%Y-%m-%d")
+            ]
 
-        dates_to_check = [
-            target_date_str,
-            (target_date + timedelta(days=7)).strftime("%Y-%m-%d")
-        ]
+        start, end = self._get_semester_bounds()
+        step = (end - start) / (weeks - 1)
+        return [(start + step * i).strftime("%Y-%m-%d") for i in range(weeks)]
 
-        unique_subjects = set()
+    async def _fetch_week_subjects(self, group_id: int, date_param: str) -> set[str]:
+        url = f"{self.base_url}/scheduler/{group_id}"
+        params = {"date": date_param}
 
-        async with httpx.AsyncClient() as client:
-            for date_param in dates_to_check:
-                url = f"{self.BASE_URL}/scheduler/{group_id}"
-                params = {"date": date_param}
+        response = await asyncio.wait_for(
+            self._get("scheduler", url, params),
+            timeout=self.config.week_timeout,
+        )
+        data = response.json()
 
-                try:
-                    response = await client.get(url, params=params, timeout=10.0)
-                    response.raise_for_status()
-                    data = response.json()
+        subjects = set()
+        for day in data.get("days", []):
+            for lesson in day.get("lessons", []):
+                subject_name = lesson.get("subject")
+                if subject_name:
+                    subjects.add(subject_name.strip())
+        return subjects
+
+    async def _get_week_subjects(self, group_id: int, date_param: str) -> set[str]:
+        return await self.single_flight.do(
+            "week", (group_id, date_param),
+            lambda: self._get_week_subjects_cached(group_id, date_param),
+        )
+
+    async def _get_week_subjects_cached(self, group_id: int, date_param: str) -> set[str]:
+        """
+        Неделя расписания через кэш: свежая запись - без запроса наружу,
+        устаревшая - сразу из кэша с фоновым обновлением, при ошибке
+        университета - последняя сохранённая копия.
+        """
+        if self.schedule_cache is None:
+            return await self._fetch_week_subjects(group_id, date_param)
+
+        week_start = ScheduleCache.week_start(date.fromisoformat(date_param))
+        cached = await self.schedule_cache.get(group_id, week_start)
+        if cached is not None:
+            subjects, age = cached
+            if age < self.config.schedule_ttl_seconds:
+                schedule_cache_lookups.inc(result="fresh")
+                return subjects
+            if age < self.config.schedule_max_stale_seconds:
+                schedule_cache_lookups.inc(result="stale")
+                if self.breaker.state != CircuitBreaker.OPEN:
+                    self._refresh_in_background(group_id, date_param, week_start)
+                return subjects
+
+        try:
+            subjects = await self._fetch_week_subjects(group_id, date_param)
+        except Exception:
+            if cached is not None:
+                schedule_cache_lookups.inc(result="fallback")
+                return cached[0]
+            raise
+        schedule_cache_lookups.inc(result="miss")
+
+        await self.schedule_cache.put(group_id, week_start, subjects)
+        return subjects
 
-                    for day in data.get("days", []):
-                        for lesson in day.get("lessons", []):
-                            subject_name = lesson.get("subject")
-                            if subject_name:
-                                unique_subjects.add(subject_name.strip())
+    def _refresh_in_background(self, group_id: int, date_param: str, week_start: date) -> None:
+        key = (group_id, week_start)
+        if key in self._refreshing:
+            return
 
+        async def refresh():
+            try:
+                subjects = await self._fetch_week_subjects(group_id, date_param)
+                await self.schedule_cache.put(group_id, week_start, subjects)
+            except Exception:
+                log.exception("Error refreshing schedule for %s", date_param)
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    async def get_subjects_list(self, group_id: int, weeks: int | None = None) -> list[str]:
+        """
+        Получает уникальный список предметов группы.
+        Недели запрашиваются параллельно (не больше fetch_concurrency одновременно),
+        поэтому время ответа близко к одному запросу даже при сканировании всего семестра.
+        """
+        if weeks is None:
+            weeks = self.config.semester_weeks
+        dates_to_check = self._get_dates_to_check(weeks)
+        semaphore = asyncio.Semaphore(self.config.fetch_concurrency)
+
+        async def fetch(date_param: str) -> set[str] | None:
+            async with semaphore:
+                try:
+                    return await self._get_week_subjects(group_id, date_param)
                 except Exception as e:
-                    print(f"Error fetching schedule for {date_param}: {e}")
-                    continue
+                    log.warning("Error fetching schedule for %s: %r", date_param, e)
+                    return None
+
+        results = await asyncio.gather(*(fetch(d) for d in dates_to_check))
+
+        if all(r is None for r in results):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Сервис расписания университета временно недоступен"
+            )
+
+        unique_subjects = set()
+        for week_subjects in results:
+            if week_subjects:
+                unique_subjects.update(week_subjects)
 
         return list(unique_subjects)
 
-uni_service = UniversityService()
+uni_service = UniversityService(
+    settings.university,
+    schedule_cache=(
+        ScheduleCache(db_helper.session_factory)
+        if settings.university.schedule_cache_enabled
+        else None
+    ),
+)
+
 
+metrics_registry.gauge(
+    "university_circuit_open",
+    "1, пока circuit breaker не пропускает запросы к ruz.spbstu.ru",
+    multiprocess_mode="max",
+).set_function(lambda: float(uni_service.breaker.state == CircuitBreaker.OPEN))
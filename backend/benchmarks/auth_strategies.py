@@ -0,0 +1,129 @@
+"""
+Сравнение стратегий авторизации по запросам в секунду.
+
+Запуск из каталога backend:
+    PYTHONPATH=app python benchmarks/auth_strategies.py --requests 2000 --concurrency 50
+    PYTHONPATH=app python benchmarks/auth_strategies.py --db-url postgresql+asyncpg://...
+
+По умолчанию используется sqlite в памяти (нужен aiosqlite из dev-зависимостей).
+Для Postgres указывайте отдельную базу: таблицы создаются через create_all.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from fastapi import Depends
+from fastapi_users.password import PasswordHelper
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from api.dependencies.authentication import authentication_backend, get_access_tokens_db
+from core.authentication.revocation import MemoryRevocationList
+from core.authentication.strategy import CachedDatabaseStrategy, SignedTokenStrategy
+from core.authentication.token_cache import MemoryTokenCache, NullTokenCache
+from core.config import settings
+from core.models import Base, User, db_helper
+from main import main_app
+
+PASSWORD = "benchmark-password"
+
+
+def make_strategies():
+    lifetime = settings.access_token.lifetime_seconds
+    memory_cache = MemoryTokenCache(max_size=10_000)
+    revocation = MemoryRevocationList(token_lifetime_seconds=lifetime)
+
+    def database(access_tokens_db=Depends(get_access_tokens_db)):
+        return CachedDatabaseStrategy(access_tokens_db, NullTokenCache(), 0, lifetime)
+
+    def database_cached(access_tokens_db=Depends(get_access_tokens_db)):
+        return CachedDatabaseStrategy(access_tokens_db, memory_cache, 60, lifetime)
+
+    def signed():
+        return SignedTokenStrategy("benchmark-secret", lifetime, revocation)
+
+    return {
+        "database": database,
+        "database+cache": database_cached,
+        "jwt": signed,
+    }
+
+
+async def seed_user(session_factory) -> str:
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    async with session_factory() as session:
+        session.add(User(
+            email=email,
+            hashed_password=PasswordHelper().hash(PASSWORD),
+            is_active=True,
+            is_superuser=False,
+            is_verified=True,
+            group_name="5130904/30105",
+        ))
+        await session.commit()
+    return email
+
+
+async def run_strategy(client: AsyncClient, email: str, path: str, requests: int, concurrency: int) -> float:
+    login = await client.post(
+        "/api/v1/auth/login",
+        data={"username": email, "password": PASSWORD},
+    )
+    login.raise_for_status()
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            response = await client.get(path, headers=headers)
+            response.raise_for_status()
+
+    await one()  # прогрев
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+async def main(db_url: str, path: str, requests: int, concurrency: int):
+    if db_url.startswith("sqlite"):
+        engine = create_async_engine(
+            db_url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+    else:
+        engine = create_async_engine(db_url, pool_size=concurrency)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def session_getter():
+        async with session_factory() as session:
+            yield session
+
+    email = await seed_user(session_factory)
+    main_app.dependency_overrides[db_helper.session_getter] = session_getter
+
+    print(f"{'strategy':<16}{'req/s':>10}")
+    async with AsyncClient(app=main_app, base_url="http://bench") as client:
+        for name, strategy in make_strategies().items():
+            main_app.dependency_overrides[authentication_backend.get_strategy] = strategy
+            rps = await run_strategy(client, email, path, requests, concurrency)
+            print(f"{name:<16}{rps:>10.0f}")
+
+    main_app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", default="sqlite+aiosqlite:///:memory:")
+    parser.add_argument("--path", default="/api/v1/users/me")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.db_url, args.path, args.requests, args.concurrency))
@@ -0,0 +1,101 @@
+"""
+Сериализация ответа /subjects/list: прежний путь через pydantic против прямого JSON из строк.
+
+Запуск из каталога backend:
+    PYTHONPATH=app python benchmarks/serialization.py --subjects 30 --activities 20 --repeat 200
+
+Прежний путь повторяет то, что делал маршрут: словарь на каждый предмет,
+ActivityRead.model_validate на каждую активность, SubjectRead.model_validate,
+затем повторная проверка и сериализация через response_model.
+"""
+import argparse
+import time
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from core.schemas.activity import ActivityRead
+from core.schemas.subject import SubjectRead
+from core.utils import subject_payloads
+
+
+def make_rows(subjects: int, activities: int):
+    subject_rows = [(s_id, f"Предмет {s_id}") for s_id in range(1, subjects + 1)]
+    activity_rows = [
+        (s_id * 1000 + a, s_id, f"Активность {a}", a % 5, 5)
+        for s_id, _ in subject_rows
+        for a in range(activities)
+    ]
+    return subject_rows, activity_rows
+
+
+def make_orm_like(subject_rows, activity_rows):
+    """Объекты с атрибутами, как у загруженных через selectinload моделей."""
+    by_subject = {}
+    for a_id, s_id, name, current, maximum in activity_rows:
+        by_subject.setdefault(s_id, []).append(SimpleNamespace(
+            id=a_id, subject_id=s_id, name=name, current_progress=current, max_progress=maximum,
+        ))
+    return [
+        SimpleNamespace(id=s_id, display_name=name, user_id=1, activities=by_subject.get(s_id, []))
+        for s_id, name in subject_rows
+    ]
+
+
+response_adapter = TypeAdapter(List[SubjectRead])
+
+
+def legacy(subjects) -> bytes:
+    subjects_list = []
+    for s in subjects:
+        subject_dict = {
+            "id": s.id,
+            "name": s.display_name,
+            "user_id": s.user_id,
+            "activities": [ActivityRead.model_validate(a) for a in s.activities],
+        }
+        subjects_list.append(SubjectRead.model_validate(subject_dict))
+    # FastAPI: проверка по response_model, jsonable_encoder, затем json.dumps в JSONResponse
+    validated = response_adapter.validate_python(
+        [s.model_dump() for s in subjects_list]
+    )
+    return to_json(jsonable_encoder(response_adapter.dump_python(validated, mode="json")))
+
+
+def fast(subject_rows, activity_rows) -> bytes:
+    # то же, что делает маршрут /list для view=full: словари из строк и pydantic_core.to_json
+    return to_json(subject_payloads(subject_rows, activity_rows))
+
+
+def measure(fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subjects", type=int, default=30)
+    parser.add_argument("--activities", type=int, default=20, help="активностей на предмет")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    subject_rows, activity_rows = make_rows(args.subjects, args.activities)
+    orm_like = make_orm_like(subject_rows, activity_rows)
+    assert legacy(orm_like) == fast(subject_rows, activity_rows)
+
+    legacy_time = measure(lambda: legacy(orm_like), args.repeat)
+    fast_time = measure(lambda: fast(subject_rows, activity_rows), args.repeat)
+
+    print(f"{args.subjects} предметов x {args.activities} активностей")
+    print(f"{'pydantic':>10}: {legacy_time * 1000:8.3f} мс")
+    print(f"{'fast':>10}: {fast_time * 1000:8.3f} мс  (x{legacy_time / fast_time:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -54,4 +54,9 @@ async def auth_headers(client: AsyncClient):
         "password": user_data["password"]
     })
     token = login_res.json()["access_token"]
-    return {"Authorization": f"Bearer {token}"}
\ No newline at end of file
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def session_factory():
+    return TestingSessionLocal
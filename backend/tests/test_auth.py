@@ -0,0 +1,158 @@
+import pytest
+
+from core.authentication.revocation import MemoryRevocationList
+from core.authentication.strategy import SignedTokenStrategy
+from core.authentication.token_cache import MemoryTokenCache
+from core.models import User
+
+
+@pytest.fixture
+def signed_strategy():
+    return SignedTokenStrategy(
+        secret="test_jwt_secret",
+        lifetime_seconds=60,
+        revocation=MemoryRevocationList(token_lifetime_seconds=60),
+    )
+
+
+def make_user() -> User:
+    return User(
+        id=7,
+        email="jwt@example.com",
+        hashed_password="hash",
+        is_active=True,
+        is_superuser=False,
+        is_verified=False,
+        group_name="5130904/30105",
+        group_id="40500",
+    )
+
+
+@pytest.mark.asyncio
+async def test_signed_token_roundtrip_without_db(signed_strategy):
+    token = await signed_strategy.write_token(make_user())
+
+    # user_manager не нужен: пользователь восстанавливается из самого токена
+    user = await signed_strategy.read_token(token, user_manager=None)
+    assert user.id == 7
+    assert user.group_name == "5130904/30105"
+
+    assert await signed_strategy.read_token(token + "x", user_manager=None) is None
+
+
+@pytest.mark.asyncio
+async def test_signed_token_logout_and_user_revocation(signed_strategy):
+    user = make_user()
+    token = await signed_strategy.write_token(user)
+    await signed_strategy.destroy_token(token, user)
+    assert await signed_strategy.read_token(token, user_manager=None) is None
+
+    other = await signed_strategy.write_token(user)
+    await signed_strategy.revocation.revoke_user(user.id)
+    assert await signed_strategy.read_token(other, user_manager=None) is None
+
+    fresh = await signed_strategy.write_token(user)
+    assert await signed_strategy.read_token(fresh, user_manager=None) is not None
+
+
+@pytest.mark.asyncio
+async def test_profile_update_revokes_only_on_credentials(signed_strategy, monkeypatch):
+    from core.authentication import user_manager as user_manager_module
+    from core.authentication.user_manager import UserManager
+
+    monkeypatch.setattr(user_manager_module, "revocation_list", signed_strategy.revocation)
+    manager = UserManager(user_db=None)
+    user = make_user()
+    token = await signed_strategy.write_token(user)
+
+    await manager.on_after_update(user, {"group_name": "5130904/30106"})
+    assert await signed_strategy.read_token(token, user_manager=None) is not None
+
+    await manager.on_after_update(user, {"password": "new-password"})
+    assert await signed_strategy.read_token(token, user_manager=None) is None
+
+
+def test_jwt_with_several_workers_requires_shared_revocation(monkeypatch):
+    from core.authentication.revocation import create_revocation_list
+    from core.config import settings
+
+    monkeypatch.setattr(settings.auth, "strategy", "jwt")
+    monkeypatch.setattr(settings.auth_cache, "backend", "memory")
+    monkeypatch.setattr(settings.db, "workers", 2)
+    with pytest.raises(RuntimeError):
+        create_revocation_list()
+
+    monkeypatch.setattr(settings.db, "workers", 1)
+    assert isinstance(create_revocation_list(), MemoryRevocationList)
+
+
+def test_cached_user_snapshot_has_no_password_hash():
+    from core.authentication.strategy import user_from_cache, user_to_cache
+
+    data = user_to_cache(make_user())
+    assert "hashed_password" not in data
+    assert user_from_cache(data).group_id == "40500"
+
+
+def test_cached_user_covers_user_read_and_fails_loudly_otherwise():
+    from sqlalchemy.orm.exc import DetachedInstanceError
+
+    from core.authentication.strategy import CACHED_USER_FIELDS, user_from_cache, user_to_cache
+    from core.schemas.user import UserRead
+
+    assert set(UserRead.model_fields) <= set(CACHED_USER_FIELDS)
+
+    user = user_from_cache(user_to_cache(make_user()))
+    UserRead.model_validate(user, from_attributes=True)
+    with pytest.raises(DetachedInstanceError):
+        _ = user.hashed_password
+
+
+def test_memory_token_cache_is_single_worker_only(monkeypatch):
+    from core.authentication.token_cache import MemoryTokenCache, create_token_cache
+    from core.config import settings
+
+    monkeypatch.setattr(settings.auth_cache, "backend", "memory")
+    monkeypatch.setattr(settings.db, "workers", 2)
+    with pytest.raises(RuntimeError):
+        create_token_cache()
+
+    monkeypatch.setattr(settings.db, "workers", 1)
+    assert isinstance(create_token_cache(), MemoryTokenCache)
+
+
+def test_app_imports_with_several_workers_and_default_settings():
+    import os
+    import subprocess
+    import sys
+
+    env = {k: v for k, v in os.environ.items() if not k.startswith("APP_CONFIG__AUTH")}
+    env["APP_CONFIG__DB__WORKERS"] = "4"
+    result = subprocess.run(
+        [sys.executable, "-c", "import main; from core.authentication.token_cache import token_cache; "
+                               "print(type(token_cache).__name__)"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "NullTokenCache"
+
+
+@pytest.mark.asyncio
+async def test_memory_token_cache_lru_and_invalidation():
+    cache = MemoryTokenCache(max_size=2)
+    await cache.set("a", 1, {"id": 1}, ttl=60)
+    await cache.set("b", 2, {"id": 2}, ttl=60)
+    assert await cache.get("a") == {"id": 1}
+
+    # "b" давно не читали - вытесняется первым
+    await cache.set("c", 1, {"id": 1}, ttl=60)
+    assert await cache.get("b") is None
+
+    await cache.invalidate_user(1)
+    assert await cache.get("a") is None
+    assert await cache.get("c") is None
+
+    await cache.set("expired", 3, {"id": 3}, ttl=0)
+    assert await cache.get("expired") is None
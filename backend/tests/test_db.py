@@ -0,0 +1,28 @@
+from core.config import DatabaseConfig
+from core.models.db_helper import DatabaseHelper
+
+
+def test_pool_limits_split_between_workers():
+    url = "postgresql+asyncpg://u:p@localhost/db"
+    assert DatabaseConfig(url=url).pool_limits() == (50, 10)
+    # без явного лимита воркеры тоже делят соединения, а не открывают по 60 каждый
+    assert DatabaseConfig(url=url, workers=4).pool_limits() == (20, 0)
+    assert DatabaseConfig(url=url, max_connections=None, workers=4).pool_limits() == (50, 10)
+
+    config = DatabaseConfig(url=url, max_connections=90, workers=4)
+    assert config.pool_limits() == (22, 0)
+
+    config = DatabaseConfig(url=url, max_connections=90, workers=4, pool_size=15)
+    assert config.pool_limits() == (15, 7)
+
+
+async def test_pool_warmup_opens_connections(tmp_path):
+    helper = DatabaseHelper(
+        url=f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        pool_size=3,
+        max_overflow=0,
+        statement_cache_size=0,
+    )
+    await helper.warmup(3)
+    assert helper.engine.pool.checkedin() == 3
+    await helper.dispose()
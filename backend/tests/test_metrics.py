@@ -0,0 +1,132 @@
+import json
+import os
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from core.config import MetricsConfig, UniversityApiConfig
+from core.metrics import MetricsExporter, Registry
+from core.metrics.http import requests_total
+from core.metrics.db import pool_checkout_seconds, query_seconds
+from core.models.db_helper import DatabaseHelper
+from services.unversity import UniversityService, upstream_requests
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Задержка", labelnames=("route",), buckets=(0.1, 1.0))
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+    latency.observe(5, route="/a")
+    registry.counter("calls", "Вызовы").inc()
+
+    text_format = registry.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text_format
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in text_format
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text_format
+    assert 'latency_seconds_count{route="/a"} 3' in text_format
+    assert "calls_total 1" in text_format
+
+
+async def test_engine_reports_pool_and_query_latency(tmp_path):
+    helper = DatabaseHelper(url=f"sqlite+aiosqlite:///{tmp_path / 'metrics.db'}", pool_size=2)
+    checkouts = pool_checkout_seconds.count(route="-")
+    selects = query_seconds.count(route="-", operation="SELECT")
+
+    async with helper.session_factory() as session:
+        await session.execute(text("SELECT 1"))
+
+    assert pool_checkout_seconds.count(route="-") == checkouts + 1
+    assert query_seconds.count(route="-", operation="SELECT") == selects + 1
+    await helper.dispose()
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client: AsyncClient):
+    res = await client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert "# TYPE db_pool_in_use gauge" in res.text
+    assert "# TYPE db_query_seconds histogram" in res.text
+
+
+@pytest.mark.asyncio
+async def test_requests_are_labeled_by_route_template(client: AsyncClient, auth_headers):
+    created = (await client.post("/api/v1/subjects/add", json={"name": "Химия"}, headers=auth_headers)).json()
+    before = requests_total.get(route="/v1/subjects/{subject_id}", method="GET", status="200")
+
+    await client.get(f"/api/v1/subjects/{created['id']}", headers=auth_headers)
+    await client.get("/api/v1/no-such-path", headers=auth_headers)
+
+    assert requests_total.get(route="/v1/subjects/{subject_id}", method="GET", status="200") == before + 1
+    assert requests_total.get(route="<unmatched>", method="GET", status="404") >= 1
+
+
+@pytest.mark.asyncio
+async def test_exporter_sums_worker_snapshots(tmp_path):
+    registry = Registry()
+    requests = registry.counter("requests", "Запросы", labelnames=("route",))
+    in_flight = registry.gauge("in_flight", "В работе")
+    requests.inc(2, route="/a")
+    in_flight.set(3)
+
+    # снимок другого, уже завершившегося воркера
+    other = Registry()
+    other.counter("requests", "Запросы", labelnames=("route",)).inc(5, route="/a")
+    other.gauge("in_flight", "В работе").set(7)
+    dead_pid = 2 ** 22 + 1
+    (tmp_path / f"{dead_pid}.json").write_text(json.dumps(other.snapshot()))
+
+    exporter = MetricsExporter(registry, MetricsConfig(multiproc_dir=str(tmp_path)))
+    text_format = exporter.render()
+
+    assert (tmp_path / f"{os.getpid()}.json").exists()
+    assert 'requests_total{route="/a"} 7' in text_format
+    # gauge завершившегося процесса не учитывается
+    assert "in_flight 3" in text_format
+
+    # снимок завершившегося воркера слит в aggregate.json и больше не читается отдельно
+    assert not (tmp_path / f"{dead_pid}.json").exists()
+    assert (tmp_path / "aggregate.json").exists()
+    assert 'requests_total{route="/a"} 7' in exporter.render()
+
+    # при остановке свой снимок тоже уходит в aggregate.json
+    await exporter.stop()
+    assert sorted(file.name for file in tmp_path.glob("*.json")) == ["aggregate.json"]
+    next_worker = MetricsExporter(Registry(), MetricsConfig(multiproc_dir=str(tmp_path)))
+    assert 'requests_total{route="/a"} 7' in next_worker.render()
+
+    MetricsExporter.clear(str(tmp_path))
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_exporter_gauge_modes_across_live_workers(tmp_path):
+    def worker_registry(open_flag: float, in_flight: float) -> Registry:
+        registry = Registry()
+        registry.gauge("circuit_open", "Цепь разомкнута", multiprocess_mode="max").set(open_flag)
+        registry.gauge("in_flight", "В работе").set(in_flight)
+        return registry
+
+    # снимок другого, ещё работающего воркера
+    live_pid = os.getppid()
+    (tmp_path / f"{live_pid}.json").write_text(json.dumps(worker_registry(1, 4).snapshot()))
+
+    exporter = MetricsExporter(worker_registry(1, 2), MetricsConfig(multiproc_dir=str(tmp_path)))
+    text_format = await exporter.render_async()
+    assert "circuit_open 1" in text_format
+    assert "in_flight 6" in text_format
+
+
+@pytest.mark.asyncio
+async def test_university_requests_are_counted():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"groups": [{"id": 1}]})
+
+    before = upstream_requests.get(endpoint="search_groups", outcome="ok")
+    service = UniversityService(UniversityApiConfig(), transport=httpx.MockTransport(handler))
+    await service.get_group_id_by_number("5130904/30105")
+    await service.close()
+    assert upstream_requests.get(endpoint="search_groups", outcome="ok") == before + 1
@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import select, text
+
+from core.models import Activity, Subject
+
+# Планировщик тестовой sqlite без индекса по внешнему ключу выбирает SCAN
+# всей таблицы - так же, как Postgres выбирает Seq Scan на реальных объёмах.
+
+
+async def query_plan(session, stmt) -> list[str]:
+    sql = stmt.compile(
+        dialect=session.get_bind().dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    rows = await session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+    return [row[-1] for row in rows]
+
+
+def full_scans(plan: list[str], table: str) -> list[str]:
+    return [line for line in plan if line.startswith(f"SCAN {table}")]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "stmt, table",
+    [
+        (select(Subject).where(Subject.user_id == 1), "subjects"),
+        (select(Subject).where(Subject.id == 1, Subject.user_id == 1), "subjects"),
+        (select(Subject.id).where(Subject.user_id == 1), "subjects"),
+        (select(Activity).where(Activity.subject_id.in_([1, 2, 3])), "activities"),
+        (
+            select(Activity.id).where(
+                Activity.id == 1,
+                Activity.subject_id.in_(select(Subject.id).where(Subject.user_id == 1)),
+            ),
+            "activities",
+        ),
+    ],
+)
+async def test_subject_queries_use_indexes(session_factory, stmt, table):
+    async with session_factory() as session:
+        plan = await query_plan(session, stmt)
+    assert not full_scans(plan, table), plan
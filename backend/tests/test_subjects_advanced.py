@@ -46,4 +46,207 @@ async def test_delete_subject_cascade(client: AsyncClient, auth_headers):
 
     list_resp = await client.get("/api/v1/subjects/list", headers=auth_headers)
     names = [item["name"] for item in list_resp.json()]
-    assert "Физика на удаление" not in names
\ No newline at end of file
+    assert "Физика на удаление" not in names
+
+@pytest.mark.asyncio
+async def test_batch_operations(client: AsyncClient, auth_headers):
+    existing = await client.post("/api/v1/subjects/add", json={"name": "Старый"}, headers=auth_headers)
+    existing_id = existing.json()["id"]
+
+    batch = {"operations": [
+        {"op": "create_subject", "name": "Офлайн предмет"},
+        {"op": "add_activity", "subject_ref": 0, "name": "ЛР", "max_progress": 4},
+        {"op": "progress", "activity_ref": 1, "delta": 3},
+        {"op": "progress", "activity_ref": 1, "delta": -1},
+        {"op": "delete_subject", "subject_id": existing_id},
+        {"op": "add_activity", "subject_id": existing_id, "name": "Поздно", "max_progress": 1},
+        {"op": "delete_activity", "activity_id": 999999},
+    ]}
+    resp = await client.post("/api/v1/subjects/batch", json=batch, headers=auth_headers)
+    assert resp.status_code == 200
+
+    results = resp.json()
+    assert [r["status_code"] for r in results] == [201, 201, 200, 200, 204, 404, 404]
+    assert results[3]["activity"]["current_progress"] == 2
+
+    list_resp = await client.get("/api/v1/subjects/list", headers=auth_headers)
+    by_name = {s["name"]: s for s in list_resp.json()}
+    assert "Старый" not in by_name
+    assert by_name["Офлайн предмет"]["activities"][0]["current_progress"] == 2
+
+
+@pytest.mark.asyncio
+async def test_logout_invalidates_cached_token(client: AsyncClient, auth_headers):
+    first = await client.get("/api/v1/subjects/list", headers=auth_headers)
+    assert first.status_code == 200
+
+    logout = await client.post("/api/v1/auth/logout", headers=auth_headers)
+    assert logout.status_code == 204
+
+    after = await client.get("/api/v1/subjects/list", headers=auth_headers)
+    assert after.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_with_etag(client: AsyncClient, auth_headers):
+    sub = await client.post("/api/v1/subjects/add", json={"name": "Химия"}, headers=auth_headers)
+    sub_id = sub.json()["id"]
+
+    first = await client.get("/api/v1/subjects/list", headers=auth_headers)
+    etag = first.headers["etag"]
+
+    cached = await client.get("/api/v1/subjects/list", headers={**auth_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+    detail = await client.get(f"/api/v1/subjects/{sub_id}", headers={**auth_headers, "If-None-Match": etag})
+    assert detail.status_code == 304
+
+    # любое изменение активностей меняет версию
+    act = await client.post(
+        f"/api/v1/subjects/{sub_id}/activity-add",
+        json={"name": "Лаба", "max_progress": 2},
+        headers=auth_headers,
+    )
+    await client.patch(f"/api/v1/subjects/activities/{act.json()['id']}/plus", headers=auth_headers)
+
+    fresh = await client.get("/api/v1/subjects/list", headers={**auth_headers, "If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert fresh.json()[0]["activities"][0]["current_progress"] == 1
+
+
+@pytest.mark.asyncio
+async def test_changes_since_cursor(client: AsyncClient, auth_headers):
+    math = (await client.post("/api/v1/subjects/add", json={"name": "Математика"}, headers=auth_headers)).json()
+    physics = (await client.post("/api/v1/subjects/add", json={"name": "Физика"}, headers=auth_headers)).json()
+    act = (await client.post(
+        f"/api/v1/subjects/{math['id']}/activity-add",
+        json={"name": "ДЗ", "max_progress": 3},
+        headers=auth_headers,
+    )).json()
+
+    full = (await client.get("/api/v1/subjects/changes", headers=auth_headers)).json()
+    assert full["reset"] is True
+    assert {s["name"] for s in full["subjects"]} == {"Математика", "Физика"}
+    assert [a["id"] for a in full["activities"]] == [act["id"]]
+    cursor = full["cursor"]
+
+    nothing = (await client.get(f"/api/v1/subjects/changes?since={cursor}", headers=auth_headers)).json()
+    assert nothing == {
+        "cursor": cursor, "reset": False, "subjects": [], "activities": [],
+        "deleted_subjects": [], "deleted_activities": [],
+    }
+
+    await client.patch(f"/api/v1/subjects/activities/{act['id']}/plus", headers=auth_headers)
+    await client.delete(f"/api/v1/subjects/{physics['id']}", headers=auth_headers)
+
+    delta = (await client.get(f"/api/v1/subjects/changes?since={cursor}", headers=auth_headers)).json()
+    assert delta["reset"] is False
+    assert delta["cursor"] > cursor
+    assert delta["subjects"] == []
+    assert [(a["id"], a["current_progress"]) for a in delta["activities"]] == [(act["id"], 1)]
+    assert delta["deleted_subjects"] == [physics["id"]]
+
+
+@pytest.mark.asyncio
+async def test_list_pagination_and_views(client: AsyncClient, auth_headers):
+    ids = []
+    for name in ["Алгебра", "Геометрия", "История", "Химия", "Биология"]:
+        ids.append((await client.post("/api/v1/subjects/add", json={"name": name}, headers=auth_headers)).json()["id"])
+    act = (await client.post(
+        f"/api/v1/subjects/{ids[0]}/activity-add",
+        json={"name": "Тест", "max_progress": 1},
+        headers=auth_headers,
+    )).json()
+    await client.patch(f"/api/v1/subjects/activities/{act['id']}/plus", headers=auth_headers)
+    await client.post(
+        f"/api/v1/subjects/{ids[0]}/activity-add",
+        json={"name": "ДЗ", "max_progress": 3},
+        headers=auth_headers,
+    )
+
+    seen = []
+    after = None
+    while True:
+        params = {"limit": 2, "view": "none"}
+        if after is not None:
+            params["after"] = after
+        page = await client.get("/api/v1/subjects/list", params=params, headers=auth_headers)
+        assert all(set(s) == {"id", "name"} for s in page.json())
+        seen.extend(s["id"] for s in page.json())
+        after = page.headers.get("x-next-cursor")
+        if after is None:
+            break
+    assert seen == ids
+
+    summary = await client.get(
+        "/api/v1/subjects/list", params={"view": "summary", "limit": 1}, headers=auth_headers
+    )
+    assert summary.json() == [{
+        "name": "Алгебра", "id": ids[0], "activities_count": 2, "activities_completed": 1,
+    }]
+
+    only_names = await client.get("/api/v1/subjects/list", params={"fields": "name"}, headers=auth_headers)
+    assert only_names.json()[0] == {"name": "Алгебра"}
+
+    bad = await client.get("/api/v1/subjects/list", params={"fields": "activities_count"}, headers=auth_headers)
+    assert bad.status_code == 422
+
+    paths = (await client.get("/openapi.json")).json()["paths"]
+    list_path = next(path for path in paths if path.endswith("/subjects/list"))
+    items = paths[list_path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]["items"]
+    assert {ref["$ref"].rsplit("/", 1)[-1] for ref in items["anyOf"]} == {
+        "SubjectRead", "SubjectSummaryRead", "SubjectNameRead",
+    }
+
+
+@pytest.mark.asyncio
+async def test_progress_history_from_rollups(client: AsyncClient, auth_headers, session_factory):
+    from sqlalchemy import func, select
+
+    from core.models import ProgressEvent
+    from services.progress_rollup import ProgressRollup
+
+    math = (await client.post("/api/v1/subjects/add", json={"name": "Матан"}, headers=auth_headers)).json()
+    other = (await client.post("/api/v1/subjects/add", json={"name": "Химия"}, headers=auth_headers)).json()
+    labs = (await client.post(
+        f"/api/v1/subjects/{math['id']}/activity-add",
+        json={"name": "Лабы", "max_progress": 3},
+        headers=auth_headers,
+    )).json()
+    await client.patch(f"/api/v1/subjects/activities/{labs['id']}/plus?step=5", headers=auth_headers)
+    await client.patch(f"/api/v1/subjects/activities/{labs['id']}/minus", headers=auth_headers)
+    await client.post("/api/v1/subjects/batch", json={"operations": [
+        {"op": "add_activity", "subject_id": other["id"], "name": "Тест", "max_progress": 2},
+        {"op": "progress", "activity_ref": 0, "delta": 1},
+    ]}, headers=auth_headers)
+
+    # до свёртки графики пустые: сырые события не читаются
+    history = (await client.get("/api/v1/subjects/history?days=3", headers=auth_headers)).json()
+    assert [d["events"] for d in history["days"]] == [0, 0, 0]
+
+    assert await ProgressRollup(session_factory).run_once() == 5
+    async with session_factory() as session:
+        assert await session.scalar(select(func.count()).select_from(ProgressEvent)) == 0
+
+    history = (await client.get("/api/v1/subjects/history?days=3", headers=auth_headers)).json()
+    today = history["days"][-1]
+    assert len(history["days"]) == 3
+    assert today["events"] == 5
+    # plus на 5 упирается в максимум 3, в журнал попадает фактический сдвиг
+    assert (today["current_progress"], today["max_progress"]) == (3, 5)
+
+    await client.delete(f"/api/v1/subjects/{math['id']}", headers=auth_headers)
+    await ProgressRollup(session_factory).run_once()
+
+    today = (await client.get("/api/v1/subjects/history?days=1", headers=auth_headers)).json()["days"][-1]
+    assert (today["current_progress"], today["max_progress"]) == (1, 2)
+
+    by_subject = (await client.get(
+        f"/api/v1/subjects/history?days=1&subject_id={other['id']}", headers=auth_headers
+    )).json()
+    assert by_subject["days"][-1]["current_progress"] == 1
+    missing = await client.get(f"/api/v1/subjects/history?subject_id={math['id']}", headers=auth_headers)
+    assert missing.status_code == 404
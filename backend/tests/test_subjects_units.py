@@ -86,4 +86,163 @@ async def test_progress_boundaries(client: AsyncClient, auth_headers):
     await client.patch(f"/api/v1/subjects/activities/{a_id}/plus", headers=auth_headers)
     await client.patch(f"/api/v1/subjects/activities/{a_id}/plus", headers=auth_headers)
     res_max = await client.get(f"/api/v1/subjects/{s_id}", headers=auth_headers)
-    assert res_max.json()["activities"][0]["current_progress"] == 1
\ No newline at end of file
+    assert res_max.json()["activities"][0]["current_progress"] == 1
+
+@pytest.mark.asyncio
+async def test_progress_step_is_clamped(client: AsyncClient, auth_headers):
+    sub = await client.post("/api/v1/subjects/add", json={"name": "Шаги"}, headers=auth_headers)
+    s_id = sub.json()["id"]
+    act = await client.post(f"/api/v1/subjects/{s_id}/activity-add",
+                           json={"name": "Лабы", "max_progress": 5}, headers=auth_headers)
+    a_id = act.json()["id"]
+
+    res = await client.patch(f"/api/v1/subjects/activities/{a_id}/plus?step=3", headers=auth_headers)
+    assert res.json()["current_progress"] == 3
+
+    res = await client.patch(f"/api/v1/subjects/activities/{a_id}/plus?step=3", headers=auth_headers)
+    assert res.json()["current_progress"] == 5
+
+    res = await client.patch(f"/api/v1/subjects/activities/{a_id}/minus?step=10", headers=auth_headers)
+    assert res.json()["current_progress"] == 0
+
+    res = await client.patch(f"/api/v1/subjects/activities/{a_id}/plus?step=0", headers=auth_headers)
+    assert res.status_code == 422
+
+    res = await client.patch("/api/v1/subjects/activities/999999/plus", headers=auth_headers)
+    assert res.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_duplicate_subject_name_conflicts(client: AsyncClient, auth_headers):
+    first = await client.post("/api/v1/subjects/add", json={"name": "Дубль"}, headers=auth_headers)
+    assert first.status_code == 201
+
+    second = await client.post("/api/v1/subjects/add", json={"name": "Дубль"}, headers=auth_headers)
+    assert second.status_code == 409
+
+    list_res = await client.get("/api/v1/subjects/list", headers=auth_headers)
+    assert [s["name"] for s in list_res.json()].count("Дубль") == 1
+
+
+@pytest.mark.asyncio
+async def test_progress_stats(client: AsyncClient, auth_headers):
+    math = (await client.post("/api/v1/subjects/add", json={"name": "Матан"}, headers=auth_headers)).json()
+    await client.post("/api/v1/subjects/add", json={"name": "Пустой"}, headers=auth_headers)
+    labs = (await client.post(
+        f"/api/v1/subjects/{math['id']}/activity-add",
+        json={"name": "Лабы", "max_progress": 4},
+        headers=auth_headers,
+    )).json()
+    await client.post(
+        f"/api/v1/subjects/{math['id']}/activity-add",
+        json={"name": "Тест", "max_progress": 1},
+        headers=auth_headers,
+    )
+    await client.patch(f"/api/v1/subjects/activities/{labs['id']}/plus?step=2", headers=auth_headers)
+
+    res = await client.get("/api/v1/subjects/stats", headers=auth_headers)
+    assert res.status_code == 200
+    data = res.json()
+
+    by_name = {s["name"]: s for s in data["subjects"]}
+    assert by_name["Матан"]["activities_count"] == 2
+    assert by_name["Матан"]["current_progress"] == 2
+    assert by_name["Матан"]["max_progress"] == 5
+    assert by_name["Матан"]["remaining"] == 3
+    assert by_name["Матан"]["completion"] == pytest.approx(0.4)
+    assert by_name["Пустой"]["activities_count"] == 0
+    assert by_name["Пустой"]["completion"] == 0.0
+    assert data["total"]["max_progress"] == 5
+    assert data["total"]["remaining"] == 3
+
+    cached = await client.get(
+        "/api/v1/subjects/stats", headers={**auth_headers, "If-None-Match": res.headers["etag"]}
+    )
+    assert cached.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_subject_counters_follow_writes(client: AsyncClient, auth_headers, session_factory):
+    from sqlalchemy import select, update
+
+    from core.models import Subject
+
+    subject = (await client.post("/api/v1/subjects/add", json={"name": "Физика"}, headers=auth_headers)).json()
+    labs = (await client.post(
+        f"/api/v1/subjects/{subject['id']}/activity-add",
+        json={"name": "Лабы", "max_progress": 3},
+        headers=auth_headers,
+    )).json()
+    batch = await client.post("/api/v1/subjects/batch", json={"operations": [
+        {"op": "add_activity", "subject_id": subject["id"], "name": "Тест", "max_progress": 1},
+        {"op": "progress", "activity_ref": 0, "delta": 1},
+        {"op": "progress", "activity_id": labs["id"], "delta": 2},
+    ]}, headers=auth_headers)
+    assert batch.status_code == 200
+
+    async def counters():
+        async with session_factory() as session:
+            row = (await session.execute(
+                select(
+                    Subject.activities_count,
+                    Subject.activities_completed,
+                    Subject.progress_current,
+                    Subject.progress_max,
+                ).where(Subject.id == subject["id"])
+            )).one()
+        return tuple(row)
+
+    assert await counters() == (2, 1, 3, 4)
+
+    # сдвиг за max_progress обрезается, счётчики сдвигаются на фактическое изменение
+    await client.patch(f"/api/v1/subjects/activities/{labs['id']}/plus?step=5", headers=auth_headers)
+    assert await counters() == (2, 2, 4, 4)
+    async with session_factory() as session:
+        assert await Subject.find_drifted(session, [subject["id"]]) == []
+
+    await client.patch(f"/api/v1/subjects/activities/{labs['id']}/minus", headers=auth_headers)
+    await client.delete(f"/api/v1/subjects/activities/{labs['id']}", headers=auth_headers)
+    assert await counters() == (1, 1, 1, 1)
+
+    summary = (await client.get("/api/v1/subjects/list?view=summary", headers=auth_headers)).json()
+    assert summary[0]["activities_count"] == 1
+    assert summary[0]["activities_completed"] == 1
+
+    # испорченные счётчики восстанавливаются пересчётом, верные строки не трогаются
+    async with session_factory() as session:
+        await session.execute(update(Subject).values(activities_count=7, progress_max=0))
+        assert await Subject.refresh_counters(session, only_drifted=True) == 1
+        assert await Subject.refresh_counters(session, only_drifted=True) == 0
+        await session.commit()
+    assert await counters() == (1, 1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_counter_repair_bumps_version(client: AsyncClient, auth_headers, session_factory, monkeypatch):
+    from sqlalchemy import update
+
+    from actions.recompute_subject_counters import recompute_subject_counters
+    from core.models import db_helper, Subject
+
+    monkeypatch.setattr(db_helper, "session_factory", session_factory)
+    await client.post("/api/v1/subjects/add", json={"name": "Химия"}, headers=auth_headers)
+    before = await client.get("/api/v1/subjects/list?view=summary", headers=auth_headers)
+
+    assert await recompute_subject_counters() == 0
+    cached = await client.get(
+        "/api/v1/subjects/list?view=summary",
+        headers={**auth_headers, "If-None-Match": before.headers["etag"]},
+    )
+    assert cached.status_code == 304
+
+    async with session_factory() as session:
+        await session.execute(update(Subject).values(activities_count=5))
+        await session.commit()
+    assert await recompute_subject_counters(batch_size=1) == 1
+
+    fresh = await client.get(
+        "/api/v1/subjects/list?view=summary",
+        headers={**auth_headers, "If-None-Match": before.headers["etag"]},
+    )
+    assert fresh.status_code == 200
+    assert fresh.json()[0]["activities_count"] == 0
@@ -1,7 +1,11 @@
+from typing import List
+
 import pytest
-from pydantic import ValidationError
-from core.schemas.activity import ActivityCreate
-from core.schemas.subject import SubjectCreate
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import to_json
+from core.schemas.activity import ActivityCreate, ActivityRead
+from core.schemas.subject import SubjectCreate, SubjectRead
+from core.utils import subject_payloads
 
 
 def test_subject_create_validation():
@@ -51,4 +55,18 @@ def test_decrement_logic_mock():
     act_zero = MockActivity(current=0)
     if act_zero.current_progress > 0:
         act_zero.current_progress -= 1
-    assert act_zero.current_progress == 0
\ No newline at end of file
+    assert act_zero.current_progress == 0
+
+
+def test_fast_subjects_json_matches_response_model():
+    subject_rows = [(1, "Математика"), (2, "Физика")]
+    activity_rows = [(10, 1, "ДЗ", 2, 5), (11, 1, "Коллоквиум", 0, 1)]
+
+    expected = TypeAdapter(List[SubjectRead]).dump_json([
+        SubjectRead(id=1, name="Математика", activities=[
+            ActivityRead(id=10, subject_id=1, name="ДЗ", current_progress=2, max_progress=5),
+            ActivityRead(id=11, subject_id=1, name="Коллоквиум", current_progress=0, max_progress=1),
+        ]),
+        SubjectRead(id=2, name="Физика", activities=[]),
+    ])
+    assert to_json(subject_payloads(subject_rows, activity_rows)) == expected
@@ -0,0 +1,285 @@
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+
+from services.sync_worker import SyncWorker
+from services.unversity import uni_service
+
+
+@pytest.fixture
+def worker(session_factory):
+    return SyncWorker(session_factory=session_factory)
+
+
+@pytest.fixture
+def fake_university(monkeypatch):
+    async def get_group_id_by_number(group_name: str) -> int:
+        return 40500
+
+    async def get_subjects_list(group_id: int) -> list[str]:
+        return ["Математика", "Физика"]
+
+    monkeypatch.setattr(uni_service, "get_group_id_by_number", get_group_id_by_number)
+    monkeypatch.setattr(uni_service, "get_subjects_list", get_subjects_list)
+
+
+@pytest.mark.asyncio
+async def test_register_enqueues_sync_job(client: AsyncClient, auth_headers, worker, fake_university):
+    status_res = await client.get("/api/v1/sync/status", headers=auth_headers)
+    assert status_res.status_code == 200
+    assert status_res.json()["status"] == "pending"
+
+    assert await worker.run_pending() == 1
+
+    status_res = await client.get("/api/v1/sync/status", headers=auth_headers)
+    assert status_res.json()["status"] == "done"
+    assert status_res.json()["subjects_imported"] == 2
+
+    list_res = await client.get("/api/v1/subjects/list", headers=auth_headers)
+    assert sorted(s["name"] for s in list_res.json()) == ["Математика", "Физика"]
+
+    me = await client.get("/api/v1/users/me", headers=auth_headers)
+    assert me.json()["group_id"] == "40500"
+
+    # повторная синхронизация не создаёт дубликатов
+    resync = await client.post("/api/v1/sync", json={"group_name": "5130904/30105"}, headers=auth_headers)
+    assert resync.status_code == 202
+    await worker.run_pending()
+    status_res = await client.get("/api/v1/sync/status", headers=auth_headers)
+    assert status_res.json()["subjects_imported"] == 0
+
+
+@pytest.mark.asyncio
+async def test_sync_retries_with_backoff(client: AsyncClient, auth_headers, worker, monkeypatch):
+    async def unavailable(group_name: str) -> int:
+        raise HTTPException(status_code=503, detail="Сервис расписания университета временно недоступен")
+
+    monkeypatch.setattr(uni_service, "get_group_id_by_number", unavailable)
+
+    await worker.run_pending()
+    job = (await client.get("/api/v1/sync/status", headers=auth_headers)).json()
+    assert job["status"] == "pending"
+    assert job["attempts"] == 1
+    assert job["stage"] == "resolve_group"
+
+    # следующая попытка ещё не наступила
+    assert await worker.run_pending() == 0
+
+
+@pytest.mark.asyncio
+async def test_sync_unknown_group_fails_without_retry(client: AsyncClient, auth_headers, worker, monkeypatch):
+    async def not_found(group_name: str) -> int:
+        raise HTTPException(status_code=400, detail=f"Группа '{group_name}' не найдена")
+
+    monkeypatch.setattr(uni_service, "get_group_id_by_number", not_found)
+
+    await worker.run_pending()
+    job = (await client.get("/api/v1/sync/status", headers=auth_headers)).json()
+    assert job["status"] == "failed"
+    assert "не найдена" in job["last_error"]
+
+
+@pytest.mark.asyncio
+async def test_group_catalog_is_shared(client: AsyncClient, auth_headers, worker, monkeypatch):
+    calls = []
+
+    async def get_group_id_by_number(group_name: str) -> int:
+        return 40500
+
+    async def get_subjects_list(group_id: int) -> list[str]:
+        calls.append(group_id)
+        return ["Математика", "Физика"]
+
+    monkeypatch.setattr(uni_service, "get_group_id_by_number", get_group_id_by_number)
+    monkeypatch.setattr(uni_service, "get_subjects_list", get_subjects_list)
+
+    # свой предмет с тем же названием становится ссылкой на каталог вместе с активностями
+    own = (await client.post("/api/v1/subjects/add", json={"name": "Физика"}, headers=auth_headers)).json()
+    await client.post(
+        f"/api/v1/subjects/{own['id']}/activity-add",
+        json={"name": "Лабы", "max_progress": 4},
+        headers=auth_headers,
+    )
+    await worker.run_pending()
+
+    subjects = (await client.get("/api/v1/subjects/list", headers=auth_headers)).json()
+    by_name = {s["name"]: s for s in subjects}
+    assert sorted(by_name) == ["Математика", "Физика"]
+    assert by_name["Физика"]["id"] == own["id"]
+    assert [a["name"] for a in by_name["Физика"]["activities"]] == ["Лабы"]
+
+    # второй студент группы получает готовый каталог без запроса к расписанию
+    user_data = {"email": "second@example.com", "password": "password123", "group_name": "5130904/30105"}
+    await client.post("/api/v1/auth/register", json=user_data)
+    login = await client.post(
+        "/api/v1/auth/login",
+        data={"username": user_data["email"], "password": user_data["password"]},
+    )
+    second_headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    await worker.run_pending()
+
+    assert calls == [40500]
+    second = (await client.get("/api/v1/subjects/list", headers=second_headers)).json()
+    assert sorted(s["name"] for s in second) == ["Математика", "Физика"]
+    assert all(not s["activities"] for s in second)
+
+
+@pytest.mark.asyncio
+async def test_group_leaderboard(client: AsyncClient, auth_headers, worker, fake_university, session_factory):
+    no_group = await client.get("/api/v1/leaderboard", headers=auth_headers)
+    assert no_group.status_code == 404
+
+    async def register(email: str) -> dict:
+        user_data = {"email": email, "password": "password123", "group_name": "5130904/30105"}
+        await client.post("/api/v1/auth/register", json=user_data)
+        login = await client.post(
+            "/api/v1/auth/login",
+            data={"username": user_data["email"], "password": user_data["password"]},
+        )
+        return {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    others = [await register("second@example.com"), await register("third@example.com")]
+    await worker.run_pending()
+
+    async def earn(headers: dict, points: int) -> int:
+        subject = (await client.get("/api/v1/subjects/list?view=none", headers=headers)).json()[0]
+        activity = (await client.post(
+            f"/api/v1/subjects/{subject['id']}/activity-add",
+            json={"name": "Лабы", "max_progress": 10},
+            headers=headers,
+        )).json()
+        await client.patch(f"/api/v1/subjects/activities/{activity['id']}/plus?step={points}", headers=headers)
+        return activity["id"]
+
+    my_activity = await earn(auth_headers, 3)
+    await earn(others[0], 7)
+    await earn(others[1], 3)
+
+    board = (await client.get("/api/v1/leaderboard?limit=1", headers=auth_headers)).json()
+    assert board["group_id"] == 40500
+    assert [(e["rank"], e["score"]) for e in board["top"]] == [(1, 7)]
+    # не попал в top, но место известно; равный счёт - общее место
+    assert (board["me"]["rank"], board["me"]["score"]) == (2, 3)
+
+    board = (await client.get("/api/v1/leaderboard", headers=others[1])).json()
+    assert [(e["rank"], e["score"]) for e in board["top"]] == [(1, 7), (2, 3), (2, 3)]
+    assert board["me"]["rank"] == 2
+
+    # счёт сдвигается на фактическое изменение прогресса
+    await client.patch(f"/api/v1/subjects/activities/{my_activity}/minus?step=5", headers=auth_headers)
+    board = (await client.get("/api/v1/leaderboard", headers=auth_headers)).json()
+    assert (board["me"]["rank"], board["me"]["score"]) == (3, 0)
+    await client.patch(f"/api/v1/subjects/activities/{my_activity}/plus?step=3", headers=auth_headers)
+
+    # рейтинг восстанавливается из счётчиков предметов
+    from sqlalchemy import update
+
+    from core.models import LeaderboardEntry
+
+    async with session_factory() as session:
+        await session.execute(update(LeaderboardEntry).values(score=0))
+        assert await LeaderboardEntry.recompute(session) == 3
+        await session.commit()
+    board = (await client.get("/api/v1/leaderboard", headers=auth_headers)).json()
+    assert [e["score"] for e in board["top"]] == [7, 3, 3]
+
+
+@pytest.mark.asyncio
+async def test_custom_subject_named_like_catalog_link(
+        client: AsyncClient, auth_headers, worker, fake_university, session_factory
+):
+    from core.models import Subject
+
+    await worker.run_pending()
+
+    # название подключённого предмета каталога занято
+    duplicate = await client.post("/api/v1/subjects/add", json={"name": "Физика"}, headers=auth_headers)
+    assert duplicate.status_code == 409
+
+    # строка, оставшаяся от старых данных, не ломает повторную синхронизацию
+    user_id = (await client.get("/api/v1/users/me", headers=auth_headers)).json()["id"]
+    async with session_factory() as session:
+        session.add(Subject(user_id=user_id, name="Физика"))
+        await session.commit()
+
+    await client.post("/api/v1/sync", json={"group_name": "5130904/30105"}, headers=auth_headers)
+    await worker.run_pending()
+    job = (await client.get("/api/v1/sync/status", headers=auth_headers)).json()
+    assert job["status"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_ignores_stale_user_snapshot(client: AsyncClient, auth_headers, worker, fake_university):
+    from app.main import main_app
+    from core.authentication.fastapi_users import current_active_user
+    from core.models import User
+
+    me = (await client.get("/api/v1/users/me", headers=auth_headers)).json()
+    await worker.run_pending()
+
+    # снимок из JWT, выданного до синхронизации: группы в нём нет
+    stale = User(id=me["id"], email=me["email"], is_active=True, is_superuser=False, is_verified=False)
+    main_app.dependency_overrides[current_active_user] = lambda: stale
+
+    subject = (await client.get("/api/v1/subjects/list?view=none")).json()[0]
+    activity = (await client.post(
+        f"/api/v1/subjects/{subject['id']}/activity-add", json={"name": "Лабы", "max_progress": 5}
+    )).json()
+    await client.patch(f"/api/v1/subjects/activities/{activity['id']}/plus?step=2")
+
+    board = await client.get("/api/v1/leaderboard")
+    assert board.status_code == 200
+    assert board.json()["group_id"] == 40500
+    assert board.json()["me"]["score"] == 2
+
+
+@pytest.mark.asyncio
+async def test_upstream_health_requires_auth(client: AsyncClient, auth_headers):
+    assert (await client.get("/api/v1/sync/upstream")).status_code == 401
+
+    health = await client.get("/api/v1/sync/upstream", headers=auth_headers)
+    assert health.status_code == 200
+    assert set(health.json()) == {"circuit", "latency", "single_flight"}
+
+
+@pytest.mark.asyncio
+async def test_sync_status_shows_running_stage(client: AsyncClient, auth_headers, worker, monkeypatch):
+    seen = {}
+
+    async def get_group_id_by_number(group_name: str) -> int:
+        seen["resolve"] = (await client.get("/api/v1/sync/status", headers=auth_headers)).json()
+        return 40500
+
+    async def get_subjects_list(group_id: int) -> list[str]:
+        seen["import"] = (await client.get("/api/v1/sync/status", headers=auth_headers)).json()
+        return ["Математика"]
+
+    monkeypatch.setattr(uni_service, "get_group_id_by_number", get_group_id_by_number)
+    monkeypatch.setattr(uni_service, "get_subjects_list", get_subjects_list)
+
+    await worker.run_pending()
+    assert (seen["resolve"]["status"], seen["resolve"]["stage"]) == ("running", "resolve_group")
+    assert (seen["import"]["status"], seen["import"]["stage"]) == ("running", "import_subjects")
+
+
+@pytest.mark.asyncio
+async def test_resync_checks_stored_group(client: AsyncClient, auth_headers, session_factory):
+    from sqlalchemy import update
+
+    from app.main import main_app
+    from core.authentication.fastapi_users import current_active_user
+    from core.models import User
+
+    me = (await client.get("/api/v1/users/me", headers=auth_headers)).json()
+    pending = (await client.get("/api/v1/sync/status", headers=auth_headers)).json()
+    async with session_factory() as session:
+        await session.execute(update(User).where(User.id == me["id"]).values(group_name="5130904/00000"))
+        await session.commit()
+
+    # снимок из кэша ещё со старой группой, а в БД уже другая - нужна новая задача
+    stale = User(id=me["id"], email=me["email"], is_active=True, group_name=me["group_name"])
+    main_app.dependency_overrides[current_active_user] = lambda: stale
+
+    res = await client.post("/api/v1/sync", json={"group_name": me["group_name"]})
+    assert res.status_code == 202
+    assert res.json()["id"] != pending["id"]
@@ -0,0 +1,228 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+
+from core.config import UniversityApiConfig
+from core.models import ScheduleWeek
+from services.circuit_breaker import AdaptiveTimeout
+from services.schedule_cache import ScheduleCache
+from services.unversity import UniversityService
+
+
+def make_service(handler) -> UniversityService:
+    return UniversityService(UniversityApiConfig(), transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_service_reuses_one_client():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"groups": [{"id": 40500}]})
+
+    service = make_service(handler)
+    await service.start()
+    client = service.client
+
+    assert await service.get_group_id_by_number("5130904/30105") == 40500
+    assert await service.get_group_id_by_number("5130904/30105") == 40500
+    assert service.client is client
+
+    await service.close()
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_semester_scan_merges_weeks():
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        week = request.url.params["date"]
+        requested.append(week)
+        return httpx.Response(200, json={"days": [{"lessons": [
+            {"subject": "Математика"},
+            {"subject": f"Предмет {len(requested) % 3}"},
+        ]}]})
+
+    service = make_service(handler)
+    subjects = await service.get_subjects_list(40500, weeks=8)
+    await service.close()
+
+    assert len(set(requested)) == 8
+    assert sorted(subjects) == ["Математика", "Предмет 0", "Предмет 1", "Предмет 2"]
+
+
+@pytest.mark.asyncio
+async def test_subjects_list_fails_when_every_week_fails():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(502)
+
+    service = make_service(handler)
+    with pytest.raises(HTTPException) as exc:
+        await service.get_subjects_list(40500)
+    await service.close()
+
+    assert exc.value.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_schedule_cache_serves_group_from_db(session_factory):
+    calls = []
+    failing = False
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["date"])
+        if failing:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"days": [{"lessons": [{"subject": "Физика"}]}]})
+
+    service = UniversityService(
+        UniversityApiConfig(),
+        transport=httpx.MockTransport(handler),
+        schedule_cache=ScheduleCache(session_factory),
+    )
+
+    assert await service.get_subjects_list(40500) == ["Физика"]
+    assert len(calls) == 2
+
+    # второй студент той же группы не ходит в университет
+    assert await service.get_subjects_list(40500) == ["Физика"]
+    assert len(calls) == 2
+
+    # устаревшие записи отдаются сразу, обновление идёт в фоне
+    async with session_factory() as session:
+        await session.execute(
+            update(ScheduleWeek).values(fetched_at=datetime.now(timezone.utc) - timedelta(days=1))
+        )
+        await session.commit()
+    assert await service.get_subjects_list(40500) == ["Физика"]
+    await asyncio.gather(*service._refreshing.values())
+    assert len(calls) == 4
+
+    # университет недоступен - используется последняя копия
+    failing = True
+    async with session_factory() as session:
+        await session.execute(
+            update(ScheduleWeek).values(fetched_at=datetime.now(timezone.utc) - timedelta(days=30))
+        )
+        await session.commit()
+    assert await service.get_subjects_list(40500) == ["Физика"]
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_lookups_are_coalesced():
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        if "/search/groups" in request.url.path:
+            return httpx.Response(200, json={"groups": [{"id": 40500}]})
+        return httpx.Response(200, json={"days": [{"lessons": [{"subject": "Физика"}]}]})
+
+    service = make_service(handler)
+    group_ids = await asyncio.gather(
+        *(service.get_group_id_by_number("5130904/30105") for _ in range(30))
+    )
+    assert set(group_ids) == {40500}
+    assert calls == 1
+
+    await asyncio.gather(*(service.get_subjects_list(40500) for _ in range(30)))
+    assert calls == 3  # по одному запросу на каждую из двух недель
+    await service.close()
+
+    stats = service.single_flight.stats()
+    assert stats["group"] == {"calls": 30, "coalesced": 29}
+    assert stats["week"]["coalesced"] == 58
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast_and_probes():
+    calls = 0
+    healthy = False
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if not healthy:
+            raise httpx.ConnectError("down", request=request)
+        return httpx.Response(200, json={"groups": [{"id": 40500}]})
+
+    service = make_service(handler)
+    threshold = service.breaker.failure_threshold
+
+    for _ in range(threshold + 3):
+        with pytest.raises(HTTPException) as exc:
+            await service.get_group_id_by_number("5130904/30105")
+        assert exc.value.status_code == 503
+
+    # после открытия цепи запросы наружу не уходят
+    assert calls == threshold
+    assert service.health()["circuit"]["state"] == "open"
+    assert service.health()["circuit"]["rejected_total"] == 3
+
+    # по истечении reset_timeout проходит пробный запрос и закрывает цепь
+    healthy = True
+    service.breaker.opened_at -= service.breaker.reset_timeout
+    assert await service.get_group_id_by_number("5130904/30105") == 40500
+    assert service.breaker.state == "closed"
+    await service.close()
+
+
+def test_adaptive_timeout_follows_latency():
+    timeout = AdaptiveTimeout(min_timeout=1.0, max_timeout=10.0, factor=3.0, min_samples=5)
+    assert timeout.timeout() == 10.0
+
+    for _ in range(20):
+        timeout.observe(0.1)
+    assert timeout.timeout() == 1.0
+
+    for _ in range(20):
+        timeout.observe(2.0)
+    assert timeout.timeout() == 6.0
+
+
+@pytest.mark.asyncio
+async def test_timeouts_raise_adaptive_limit():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout("slow", request=request)
+
+    service = make_service(handler)
+    service.breaker.failure_threshold = 100
+    for _ in range(100):
+        service.latency.observe(0.01)
+    fast_limit = service.latency.timeout()
+    assert fast_limit == service.latency.min_timeout
+
+    for _ in range(10):
+        with pytest.raises(HTTPException):
+            await service.get_group_id_by_number("5130904/30105")
+    assert service.latency.timeout() > fast_limit
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_released_on_unexpected_error():
+    broken = True
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if broken:
+            raise RuntimeError("transport bug")
+        return httpx.Response(200, json={"groups": [{"id": 40500}]})
+
+    service = make_service(handler)
+    service.breaker.state = "open"
+    service.breaker.opened_at -= service.breaker.reset_timeout + 1
+
+    with pytest.raises(RuntimeError):
+        await service.get_group_id_by_number("5130904/30105")
+    assert service.breaker.state == "half_open"
+
+    broken = False
+    assert await service.get_group_id_by_number("5130904/30105") == 40500
+    assert service.breaker.state == "closed"
+    await service.close()